@@ -0,0 +1,150 @@
+"""Timing, baseline and command line helpers shared by the benchmark scripts.
+
+Every package keeps its benchmark cases in its own benchmark.py, which adds
+the repository root to the import path and hands its parser and cases to run_cli.
+
+A metric is better when lower unless the benchmark lists it in its
+HIGHER_IS_BETTER tuple. Seconds and peak_bytes are always compared to a
+baseline, other lower is better metrics only if the benchmark lists them.
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+# Timed runs per benchmark, the fastest one is reported
+REPEAT = 3
+
+
+def measure(func: Callable[[], float], repeat: int = REPEAT) -> tuple[float, float, int]:
+    """Run a function for the best wall time and once more under tracemalloc for the peak memory.
+
+    Prints of the function are swallowed, so they neither clutter the results nor cost time on the terminal.
+
+    Args:
+        func (Callable[[], float]): function to benchmark, returns the work done (e.g. iterations)
+        repeat (int, optional): number of timed runs. Defaults to REPEAT.
+
+    Returns:
+        tuple[float, float, int]: work done, seconds, peak memory in bytes
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            work = func()
+            seconds = min(seconds, time.perf_counter() - start)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return work, seconds, peak
+
+
+def compare_to_baseline(
+        results: dict[str, dict[str, float]],
+        baseline: dict[str, dict[str, float]],
+        threshold: float,
+        higher_is_better: tuple[str, ...] = (),
+        lower_is_better: tuple[str, ...] = (),
+        exact: tuple[str, ...] = ()
+        ) -> list[str]:
+    """Compare results to a baseline and collect all regressions beyond the threshold.
+
+    Seconds and peak memory are always compared, other metrics only if listed.
+    Counters which depend on the seed and not on the speed of the code, like
+    episodes, are left out.
+
+    Args:
+        results (dict[str, dict[str, float]]): current metrics
+        baseline (dict[str, dict[str, float]]): baseline metrics
+        threshold (float): allowed relative deviation, e.g. 0.2 for 20%
+        higher_is_better (tuple[str, ...], optional): metrics where a higher value is better. Defaults to ().
+        lower_is_better (tuple[str, ...], optional): further metrics where a lower value is better. Defaults to ().
+        exact (tuple[str, ...], optional): lower is better metrics which only depend on the data and the
+            algorithm, every increase is a regression. Defaults to ().
+
+    Returns:
+        list[str]: descriptions of all regressions
+    """
+    regressions = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            if metric not in ('seconds', 'peak_bytes', *higher_is_better, *lower_is_better, *exact):
+                continue
+            base = baseline.get(case, {}).get(metric)
+            if not base:
+                continue
+            change = (value - base) / base
+            if metric in higher_is_better:
+                change = -change
+            if change > (0 if metric in exact else threshold):
+                regressions.append(f'{case} {metric}: {base:.4g} -> {value:.4g} ({change * 100:+.1f}% worse)')
+    return regressions
+
+
+def print_results(results: dict[str, dict[str, float]]) -> None:
+    """Print the results as a table.
+
+    Args:
+        results (dict[str, dict[str, float]]): metrics per benchmark case
+    """
+    width = max(len(case) for case in results)
+    for case, metrics in results.items():
+        formatted = '; '.join(f'{metric}: {value:.4g}' for metric, value in metrics.items())
+        print(f'{case:<{width}}  {formatted}')
+
+
+def run_cli(
+        parser: argparse.ArgumentParser,
+        run_benchmarks: Callable[[argparse.Namespace], dict[str, dict[str, float]]],
+        sanity_check_args: Callable[[argparse.Namespace], None],
+        higher_is_better: tuple[str, ...] = (),
+        lower_is_better: tuple[str, ...] = (),
+        exact: tuple[str, ...] = ()
+        ) -> None:
+    """Add the baseline arguments, run the benchmarks, print them and save or compare a baseline.
+
+    Exits with status 1 if a metric regressed against the baseline.
+
+    Args:
+        parser (argparse.ArgumentParser): parser with the arguments of the package
+        run_benchmarks (Callable[[argparse.Namespace], dict[str, dict[str, float]]]): runs all cases
+        sanity_check_args (Callable[[argparse.Namespace], None]): raises ValueError on invalid arguments
+        higher_is_better (tuple[str, ...], optional): see compare_to_baseline. Defaults to ().
+        lower_is_better (tuple[str, ...], optional): see compare_to_baseline. Defaults to ().
+        exact (tuple[str, ...], optional): see compare_to_baseline. Defaults to ().
+
+    Raises:
+        ValueError: if the arguments are invalid
+    """
+    parser.add_argument('-b', '--baseline', type=str, help='Compare to this JSON baseline')
+    parser.add_argument('--save', type=str, help='Save the results as JSON baseline')
+    parser.add_argument('-t', '--threshold', type=float, default=0.2, help='Allowed relative regression')
+    args = parser.parse_args()
+
+    if args.threshold < 0:
+        raise ValueError("Threshold must be positive")
+    sanity_check_args(args)
+
+    results = run_benchmarks(args)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Saved baseline to {args.save}')
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(results, baseline, args.threshold, higher_is_better, lower_is_better, exact)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            raise SystemExit(1)
+        print(f'No regressions beyond {args.threshold * 100:.0f}%')
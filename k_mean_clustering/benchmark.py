@@ -0,0 +1,89 @@
+#!/usr/bin/env python3.10
+import argparse
+import os
+import sys
+
+from main import K_Means, RandomPointCloud
+from point import Point, PointCloud
+
+# The shared benchmark helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_tools import measure, run_cli  # noqa: E402
+
+HIGHER_IS_BETTER = ('points_per_sec', 'skipped')
+LOWER_IS_BETTER = ('distances',)
+
+ENGINES = ('array', 'hamerly')
+
+
+def setup_case(n_pts: int, k: int, seed: int) -> tuple[PointCloud, list[Point]]:
+    # k blobs of points around random centers and k random initial centroids
+    rpt = RandomPointCloud(seed)
+    centers = rpt.create(k, bounds=(0.0, 4.0), dims=3)
+    cloud = PointCloud()
+    for index, center in enumerate(centers):
+        cloud.extend(rpt.create_cloud(n_pts // k + (index < n_pts % k), biases=(*center,), dims=3))
+    return cloud, rpt.create(k, bounds=(0.0, 4.0), dims=3)
+
+
+def bench_converge(cloud: PointCloud, init: list[Point], engine: str) -> tuple[dict[str, float], list[Point]]:
+    # K-means until convergence, the plain engines compute every point-centroid distance
+    result = {}
+
+    def run() -> float:
+        km = K_Means(list(init), cloud, engine=engine)
+        km.run(max_iter=10_000)
+        result['centroids'] = km.k_points
+        result['distances'] = km.assigner.distances if km.assigner is not None else km.iterations * len(cloud) * len(init)
+        return km.iterations
+
+    iterations, seconds, peak = measure(run)
+    plain = iterations * len(cloud) * len(init)
+    metrics = {
+        'seconds': seconds,
+        'iterations': iterations,
+        'points_per_sec': iterations * len(cloud) / seconds,
+        'distances': result['distances'],
+        'skipped': 1 - result['distances'] / plain,
+        'peak_bytes': peak
+    }
+    return metrics, result['centroids']
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    # All engines for every number of clusters, they must end at the centroids of the first engine
+    results = {}
+    for k in args.clusters:
+        case = f'n{args.points}/k{k}'
+        print(f'Running {case}...')
+        cloud, init = setup_case(args.points, k, args.seed)
+        reference = None
+        for engine in args.engines:
+            results[f'{engine}/{case}'], centroids = bench_converge(cloud, init, engine)
+            if reference is None:
+                reference = centroids
+            elif centroids != reference:
+                raise RuntimeError(f'Engine {engine} does not match {args.engines[0]} for {case}')
+    return results
+
+
+def sanity_check_args(args: argparse.Namespace) -> None:
+    if any(k <= 0 for k in args.clusters):
+        raise ValueError("Number of clusters must be greater than 0")
+    if args.points < max(args.clusters):
+        raise ValueError("Number of points must be at least the number of clusters")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the k-means engines.')
+    parser.add_argument('-n', '--points', type=int, default=20_000, help='Number of points')
+    parser.add_argument('-k', '--clusters', type=int, nargs='+', default=[3, 10, 30, 100], help='Numbers of clusters')
+    parser.add_argument('-e', '--engines', type=str, nargs='+', choices=ENGINES, default=list(ENGINES),
+                        help='Engines, all are checked against the first one')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for points and centroids')
+    run_cli(parser, run_benchmarks, sanity_check_args, HIGHER_IS_BETTER, LOWER_IS_BETTER)
+
+
+if __name__ == '__main__':
+    main()
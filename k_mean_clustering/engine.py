@@ -0,0 +1,345 @@
+#!/usr/bin/env python3.10
+import collections
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from point import Point, PointCloud
+
+# Max number of point-centroid differences held in memory at once
+BLOCK_SIZE = 1 << 22
+
+
+def as_array(points: list[Point] | PointCloud | np.ndarray) -> np.ndarray:
+    if isinstance(points, PointCloud):
+        return points.data
+    if isinstance(points, np.ndarray):
+        return np.asarray(points, dtype=np.float64)
+    return np.array([(*point,) for point in points], dtype=np.float64).reshape(-1, 3)
+
+
+def as_points(array: np.ndarray) -> list[Point]:
+    return [Point(*row) for row in array.tolist()]
+
+
+def assign(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # Squared distances keep the order of Point.distance, argmin picks the first centroid on ties
+    labels = np.empty(points.shape[0], dtype=np.intp)
+    rows = max(1, BLOCK_SIZE // (centroids.shape[0] * points.shape[1]))
+    for begin in range(0, points.shape[0], rows):
+        diff = points[begin:begin + rows, np.newaxis, :] - centroids[np.newaxis, :, :]
+        labels[begin:begin + rows] = np.einsum('ijk,ijk->ij', diff, diff).argmin(axis=1)
+    return labels
+
+
+def cluster_sums(points: np.ndarray, labels: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    # bincount sums in point order like Point.__add__
+    counts = np.bincount(labels, minlength=k)
+    sums = np.column_stack([np.bincount(labels, weights=points[:, dim], minlength=k) for dim in range(points.shape[1])])
+    return sums, counts
+
+
+def update(points: np.ndarray, labels: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # Empty clusters keep their centroid
+    sums, counts = cluster_sums(points, labels, centroids.shape[0])
+    filled = counts > 0
+    new_centroids = centroids.copy()
+    new_centroids[filled] = sums[filled] / counts[filled, np.newaxis]
+    return new_centroids
+
+
+def nearest_two(points: np.ndarray, centroids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Labels like assign, with the distances to the nearest and the second nearest centroid
+    labels = np.empty(points.shape[0], dtype=np.intp)
+    nearest = np.empty(points.shape[0])
+    second = np.full(points.shape[0], np.inf)
+    rows = max(1, BLOCK_SIZE // (centroids.shape[0] * points.shape[1]))
+    for begin in range(0, points.shape[0], rows):
+        diff = points[begin:begin + rows, np.newaxis, :] - centroids[np.newaxis, :, :]
+        squared = np.einsum('ijk,ijk->ij', diff, diff)
+        block = np.arange(squared.shape[0])
+        labels[begin:begin + rows] = squared.argmin(axis=1)
+        nearest[begin:begin + rows] = squared[block, labels[begin:begin + rows]]
+        if centroids.shape[0] > 1:
+            squared[block, labels[begin:begin + rows]] = np.inf
+            second[begin:begin + rows] = squared.min(axis=1)
+    return labels, np.sqrt(nearest), np.sqrt(second)
+
+
+class HamerlyAssigner:
+    # Assignment with an upper bound to the own and a lower bound to every other centroid per
+    # point (Hamerly 2010). Points whose bounds are separated by half the distance to the
+    # closest other centroid keep their label without computing any distance.
+
+    # Relative slack on the bounds, rounding must never skip a point which plain assign would move
+    SLACK = 1e-9
+
+    def __init__(self) -> None:
+        self.labels = None
+        self.upper = None
+        self.lower = None
+        self.centroids = None
+        self.distances = 0
+
+    def assign(self, points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        n, k = points.shape[0], centroids.shape[0]
+        if self.labels is None or self.centroids.shape != centroids.shape:
+            self.labels, self.upper, self.lower = nearest_two(points, centroids)
+            self.centroids = centroids.copy()
+            self.distances += n * k
+            return self.labels.copy()
+
+        shift = np.sqrt(((centroids - self.centroids) ** 2).sum(axis=1))
+        self.centroids = centroids.copy()
+        self.upper += shift[self.labels]
+        if k > 1:
+            # Every other centroid moved at most by the largest shift of the centroids but the own one
+            order = np.argsort(shift)
+            other_shift = np.where(self.labels == order[-1], shift[order[-2]], shift[order[-1]])
+            self.lower -= other_shift
+
+        between = np.sqrt(((centroids[:, np.newaxis, :] - centroids[np.newaxis, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(between, np.inf)
+        half_gap = 0.5 * between.min(axis=1)
+        self.distances += k * (k - 1) // 2
+
+        bound = np.maximum(half_gap[self.labels], self.lower) * (1 - self.SLACK)
+        check = np.flatnonzero(self.upper * (1 + self.SLACK) >= bound)
+        diff = points[check] - centroids[self.labels[check]]
+        self.upper[check] = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        self.distances += check.size
+
+        check = check[self.upper[check] * (1 + self.SLACK) >= bound[check]]
+        self.labels[check], self.upper[check], self.lower[check] = nearest_two(points[check], centroids)
+        self.distances += check.size * k
+        return self.labels.copy()
+
+
+def inertia(points: np.ndarray, centroids: np.ndarray, labels: np.ndarray) -> float:
+    diff = points - centroids[labels]
+    return float(np.einsum('ij,ij->', diff, diff))
+
+
+def plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    # k-means++ seeding, every next centroid is a point drawn with probability of its squared
+    # distance to the closest centroid so far
+    if not 0 < k <= points.shape[0]:
+        raise ValueError("Number of clusters must be in [1, number of points]")
+    centroids = np.empty((k, points.shape[1]))
+    centroids[0] = points[rng.integers(points.shape[0])]
+    diff = points - centroids[0]
+    closest = np.einsum('ij,ij->i', diff, diff)
+    for index in range(1, k):
+        total = closest.sum()
+        chosen = rng.choice(points.shape[0], p=closest / total) if total > 0 else rng.integers(points.shape[0])
+        centroids[index] = points[chosen]
+        diff = points - centroids[index]
+        np.minimum(closest, np.einsum('ij,ij->i', diff, diff), out=closest)
+    return centroids
+
+
+def lloyd(
+        points: np.ndarray,
+        centroids: np.ndarray,
+        max_iter: int = 300,
+        assigner: HamerlyAssigner | None = None) -> tuple[np.ndarray, np.ndarray, int]:
+    # Headless assign and update until the centroids stop moving like K_Means.rec_mean
+    labels = None
+    for iteration in range(1, max_iter + 1):
+        labels = assign(points, centroids) if assigner is None else assigner.assign(points, centroids)
+        new_centroids = update(points, labels, centroids)
+        if np.array_equal(new_centroids, centroids):
+            return centroids, labels, iteration
+        centroids = new_centroids
+    return centroids, labels, max_iter
+
+
+# Points of a restart worker process, sent once per process instead of once per restart
+_worker_points = None
+
+
+def _init_worker(points: np.ndarray | str) -> None:
+    global _worker_points
+    _worker_points = open_points(points) if isinstance(points, str) else points
+
+
+def _restart(seed: np.random.SeedSequence, k: int, engine: str, max_iter: int, points: np.ndarray | None = None):
+    points = _worker_points if points is None else points
+    centroids = plus_plus(points, k, np.random.default_rng(seed))
+    assigner = HamerlyAssigner() if engine == 'hamerly' else None
+    centroids, labels, iterations = lloyd(points, centroids, max_iter, assigner)
+    return inertia(points, centroids, labels), centroids, labels, iterations
+
+
+def restarts(
+        points: np.ndarray,
+        k: int,
+        n_init: int = 10,
+        seed: int | None = None,
+        engine: str = 'array',
+        max_iter: int = 300,
+        max_workers: int | None = None) -> tuple[float, np.ndarray, np.ndarray, int]:
+    # Independent k-means++ restarts, each one seeded by its own child of the seed, so the
+    # best result does not depend on the number of workers. Ties keep the first restart
+    if n_init <= 0:
+        raise ValueError("Number of restarts must be greater than 0")
+    seeds = np.random.SeedSequence(seed).spawn(n_init)
+    if max_workers == 1 or n_init == 1:
+        results = [_restart(child, k, engine, max_iter, points) for child in seeds]
+    else:
+        # Workers reopen a memory-mapped file instead of getting a pickled copy of all its points
+        source = points
+        if isinstance(points, np.memmap) and points.filename is not None and open_points(points.filename).shape == points.shape:
+            source = points.filename
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(source,)) as executor:
+            results = list(executor.map(
+                _restart, seeds, itertools.repeat(k), itertools.repeat(engine), itertools.repeat(max_iter)))
+    return min(results, key=lambda result: result[0])
+
+
+def minibatch_step(batch: np.ndarray, centroids: np.ndarray, counts: np.ndarray) -> float:
+    # Per centroid learning rate 1 / count, all points of a batch at once give the running mean
+    sums, batch_counts = cluster_sums(batch, assign(batch, centroids), centroids.shape[0])
+    new_counts = counts + batch_counts
+    hit = batch_counts > 0
+    old = centroids[hit].copy()
+    centroids[hit] = (centroids[hit] * counts[hit, np.newaxis] + sums[hit]) / new_counts[hit, np.newaxis]
+    counts[:] = new_counts
+    return float(np.sqrt(((centroids[hit] - old) ** 2).sum(axis=1)).max(initial=0.0))
+
+
+def minibatch(
+        batches,
+        centroids: np.ndarray,
+        tolerance: float = 1e-4,
+        max_batches: int | None = None,
+        counts: np.ndarray | None = None,
+        stop: bool = True,
+        window: int = 10) -> tuple[np.ndarray, np.ndarray, dict[str, float]]:
+    # Converged when no centroid moved further than the tolerance over the last window batches.
+    # The 1 / count learning rates shrink as the counts grow, so the shift falls with the points
+    # seen so far: the tolerance bounds the movement at the current counts, not the distance to the
+    # optimum. With stop the batches end there, streams of possibly sorted chunks should be
+    # consumed completely
+    if window <= 0:
+        raise ValueError("Window must be greater than 0")
+    centroids = np.array(centroids, dtype=np.float64)
+    counts = np.zeros(centroids.shape[0], dtype=np.int64) if counts is None else counts
+    history = collections.deque([centroids.copy()], maxlen=window)
+    report = {'batches': 0, 'points': 0, 'shift': float('inf'), 'converged': False}
+    start = time.perf_counter()
+    for batch in batches:
+        if max_batches is not None and report['batches'] >= max_batches:
+            break
+        batch = as_array(batch)
+        minibatch_step(batch, centroids, counts)
+        report['batches'] += 1
+        report['points'] += batch.shape[0]
+        report['shift'] = float(np.sqrt(((centroids - history[0]) ** 2).sum(axis=1)).max())
+        history.append(centroids.copy())
+        report['converged'] = report['batches'] >= window and report['shift'] < tolerance
+        if stop and report['converged']:
+            break
+    report['seconds'] = time.perf_counter() - start
+    report['points_per_sec'] = report['points'] / report['seconds'] if report['seconds'] > 0 else 0.0
+    return centroids, counts, report
+
+
+def open_points(path: str) -> np.ndarray:
+    # Memory-mapped (n, 3) points of a .npy file, other files are raw float64 x, y, z rows
+    if path.endswith('.npy'):
+        points = np.load(path, mmap_mode='r')
+    else:
+        points = np.memmap(path, dtype=np.float64, mode='r')
+    if points.dtype != np.float64:
+        raise ValueError("Point files must hold float64, other types would be converted in memory")
+    return points.reshape(-1, 3)
+
+
+def chunk_sums(
+        points: np.ndarray,
+        centroids: np.ndarray,
+        chunk_size: int = 1 << 20,
+        prefetch: int = 2) -> tuple[np.ndarray, np.ndarray]:
+    # Assign and sum up chunk by chunk, a thread pool reads the next chunks while the current one is
+    # assigned, so at most prefetch + 1 chunks are in memory
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be greater than 0")
+    k = centroids.shape[0]
+    sums = np.zeros((k, points.shape[1]))
+    counts = np.zeros(k, dtype=np.int64)
+    begins = iter(range(0, points.shape[0], chunk_size))
+
+    def load(begin: int) -> np.ndarray:
+        return np.array(points[begin:begin + chunk_size], dtype=np.float64)
+
+    with ThreadPoolExecutor(max(1, prefetch)) as executor:
+        pending = collections.deque(executor.submit(load, begin) for begin in itertools.islice(begins, max(1, prefetch)))
+        while pending:
+            chunk = pending.popleft().result()
+            for begin in itertools.islice(begins, 1):
+                pending.append(executor.submit(load, begin))
+            partial, chunk_counts = cluster_sums(chunk, assign(chunk, centroids), k)
+            sums += partial
+            counts += chunk_counts
+    return sums, counts
+
+
+def test_assign_matches_brute_force(monkeypatch) -> None:
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(500, 3))
+    centroids = rng.normal(size=(7, 3))
+    # Ties go to the first centroid like in Point.distance loops
+    centroids[6] = centroids[2]
+    expected = [min(range(len(centroids)), key=lambda index: np.sum((point - centroids[index]) ** 2)) for point in points]
+    assert assign(points, centroids).tolist() == expected
+    # Blocks of a few points give the same labels
+    monkeypatch.setitem(globals(), 'BLOCK_SIZE', 64)
+    assert assign(points, centroids).tolist() == expected
+    labels, nearest, second = nearest_two(points, centroids)
+    assert labels.tolist() == expected
+    assert np.allclose(nearest, np.sqrt(((points - centroids[labels]) ** 2).sum(axis=1)))
+    assert np.all(second >= nearest)
+
+
+def test_hamerly_matches_lloyd() -> None:
+    rng = np.random.default_rng(1)
+    for k in (2, 5, 12):
+        points = np.concatenate([rng.normal(size=(400, 3)) + center for center in rng.uniform(0, 8, size=(k, 3))])
+        init = plus_plus(points, k, rng)
+        centroids, labels, iterations = lloyd(points, init)
+        assigner = HamerlyAssigner()
+        hamerly_centroids, hamerly_labels, hamerly_iterations = lloyd(points, init, assigner=assigner)
+        assert np.array_equal(hamerly_centroids, centroids) and np.array_equal(hamerly_labels, labels)
+        assert hamerly_iterations == iterations
+        assert assigner.distances < points.shape[0] * k * iterations
+
+
+def test_minibatch_converges_near_lloyd() -> None:
+    rng = np.random.default_rng(2)
+    centers = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [0.0, 10.0, 0.0], [0.0, 0.0, 10.0]])
+    points = np.concatenate([rng.normal(size=(2000, 3)) + center for center in centers])
+    # Seeds near the blobs, both should find the same optimum
+    init = centers + rng.normal(size=centers.shape)
+    centroids, _, _ = lloyd(points, init)
+    batches = (points[rng.integers(points.shape[0], size=256)] for _ in range(400))
+    batch_centroids, counts, report = minibatch(batches, init, tolerance=1e-2)
+    assert report['converged'] and counts.sum() == report['points']
+    assert np.abs(batch_centroids - centroids).max() < 0.1
+    assert inertia(points, batch_centroids, assign(points, batch_centroids)) < 1.01 * inertia(points, centroids, assign(points, centroids))
+
+
+def test_chunk_sums_matches_cluster_sums(tmp_path) -> None:
+    rng = np.random.default_rng(3)
+    points = rng.normal(size=(1003, 3)) * 5
+    centroids = rng.normal(size=(6, 3)) * 5
+    sums, counts = cluster_sums(points, assign(points, centroids), centroids.shape[0])
+    np.save(tmp_path / 'points.npy', points)
+    points.tofile(tmp_path / 'points.raw')
+    for name in ('points.npy', 'points.raw'):
+        mapped = open_points(str(tmp_path / name))
+        # A last chunk shorter than the others
+        chunked_sums, chunked_counts = chunk_sums(mapped, centroids, chunk_size=100, prefetch=3)
+        assert np.allclose(chunked_sums, sums) and np.array_equal(chunked_counts, counts)
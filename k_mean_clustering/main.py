@@ -1,8 +1,11 @@
 #!/usr/bin/env python3.10
 import random
-import matplotlib.pyplot as plt
 
-from point import Point
+import numpy as np
+
+from engine import (HamerlyAssigner, as_array, as_points, assign, chunk_sums, minibatch, open_points, plus_plus,
+                    restarts, update)
+from point import Point, PointCloud
 
 
 class RandomPointCloud(random.Random):
@@ -22,18 +25,94 @@ class RandomPointCloud(random.Random):
             z=self.uniform(*bounds) + biases[2] if dims >= 3 else 0.0
             ) for _ in range(n_pts)]
 
+    def create_cloud(
+            self,
+            n_pts: int,
+            bounds: tuple[float, float] = (0.0, 1.0),
+            biases: tuple[float, float, float] = (0.0, 0.0, 0.0),
+            dims: int = 2) -> PointCloud:
+        # Same numbers in the same order as create, uniform(a, b) is a + (b - a) * random(),
+        # converted in blocks so no list of all numbers is held in memory
+        dims = min(max(dims, 0), 3)
+        data = np.zeros((n_pts, 3))
+        for begin in range(0, n_pts, 1 << 16):
+            end = min(begin + (1 << 16), n_pts)
+            draws = np.fromiter((self.random() for _ in range((end - begin) * dims)), dtype=np.float64)
+            data[begin:end, :dims] = bounds[0] + (bounds[1] - bounds[0]) * draws.reshape(end - begin, dims) + biases[:dims]
+        return PointCloud(data)
+
 
 class K_Means:
+    # Points k-means++ draws from with the chunked engine, instead of reading the whole file
+    SEED_SAMPLE = 100_000
 
-    def __init__(self, k: list[Point], points: list[Point]) -> None:
-        self.k_points = k
+    def __init__(
+            self,
+            k: list[Point] | int,
+            points: list[Point] | PointCloud,
+            engine: str = 'point',
+            seed: str | int | None = None) -> None:
+        # With a number of clusters instead of initial points, they are seeded by k-means++.
+        # The chunked engine keeps no labels or cluster lists, only sums per cluster
+        if engine not in ('point', 'array', 'hamerly', 'chunked'):
+            raise ValueError(f"Unknown engine {engine}, use 'point', 'array', 'hamerly' or 'chunked'")
+        self.seed = random.Random(seed).getrandbits(128)
         self.k_lists = None
         self.points = points
+        self.engine = engine
+        self.point_array = as_array(points) if engine != 'point' or isinstance(k, int) else None
+        if isinstance(k, int):
+            rng = np.random.default_rng(self.seed)
+            sample = self.sample_array(rng) if engine == 'chunked' else self.point_array
+            k = as_points(plus_plus(np.asarray(sample), k, rng))
+        self.k_points = k
+        self.chunk_size = 1 << 20
+        self.prefetch = 2
+        self.sums = None
+        self.counts = None
+        self.assigner = HamerlyAssigner() if engine == 'hamerly' else None
+        self.labels = None
         self.iterations = 0
-        self.fig = plt.figure()
-        self.ax = self.fig.add_subplot(projection='3d')
+        self.history = []
+        # The figure is only created when rendering, pyplot is imported on first use
+        self._fig = None
+
+    @classmethod
+    def from_file(
+            cls,
+            path: str,
+            k: list[Point] | int,
+            seed: str | int | None = None,
+            chunk_size: int = 1 << 20,
+            prefetch: int = 2) -> 'K_Means':
+        # Out of core k-means over a memory-mapped .npy or raw float64 file, see engine.open_points
+        km = cls(k, PointCloud(open_points(path)), engine='chunked', seed=seed)
+        km.chunk_size = chunk_size
+        km.prefetch = prefetch
+        return km
+
+    def sample_array(self, rng: np.random.Generator) -> np.ndarray:
+        # At most SEED_SAMPLE random points in file order, read into memory
+        sample = self.point_array
+        if sample.shape[0] > self.SEED_SAMPLE:
+            sample = sample[np.sort(rng.choice(sample.shape[0], self.SEED_SAMPLE, replace=False))]
+        return np.array(sample)
 
     def k_distribute(self) -> None:
+        if self.engine == 'chunked':
+            self.sums, self.counts = chunk_sums(self.point_array, as_array(self.k_points), self.chunk_size, self.prefetch)
+            return
+        if self.engine != 'point':
+            if self.assigner is not None:
+                self.labels = self.assigner.assign(self.point_array, as_array(self.k_points))
+            else:
+                self.labels = assign(self.point_array, as_array(self.k_points))
+            if isinstance(self.points, PointCloud):
+                self.k_lists = [self.points[self.labels == group] for group in range(len(self.k_points))]
+            else:
+                self.k_lists = [[self.points[index] for index in np.flatnonzero(self.labels == group)]
+                                for group in range(len(self.k_points))]
+            return
         self.k_lists = [[] for _ in range(len(self.k_points))]
         for point in self.points:
             shortest = None
@@ -49,9 +128,20 @@ class K_Means:
             self.k_lists[group].append(point)
 
     def k_mean(self) -> list[Point]:
+        if self.engine == 'chunked':
+            centroids = as_array(self.k_points).copy()
+            filled = self.counts > 0
+            centroids[filled] = self.sums[filled] / self.counts[filled, np.newaxis]
+            return as_points(centroids)
+        if self.engine != 'point':
+            return as_points(update(self.point_array, self.labels, as_array(self.k_points)))
         ret = []
-        for pt_list in self.k_lists:
+        for pt_list, k_point in zip(self.k_lists, self.k_points):
             length = len(pt_list)
+            if length == 0:
+                # Empty clusters keep their point like the array engines
+                ret.append(k_point)
+                continue
             point = Point()
             for pt in pt_list:
                 point += pt
@@ -59,31 +149,116 @@ class K_Means:
             ret.append(point)
         return ret
 
-    def rec_mean(self) -> None:
-        self.iterations += 1
-        self.k_distribute()
-        pt_mean = self.k_mean()
-        end = True
-        for m_pt, k_pt in zip(pt_mean, self.k_points):
-            if m_pt != k_pt:
-                end = False
-        print(f"Current points: {self.k_points}\nTarget points: {pt_mean}\nIterations: {self.iterations}")
-        x, y, z = Point.extract_from_ptlist(self.k_lists[0])
-        x_2, y_2, z_2 = Point.extract_from_ptlist(self.k_lists[1])
-        x_3, y_3, z_3 = Point.extract_from_ptlist(self.k_lists[2])
-        x_m, y_m, z_m = Point.extract_from_ptlist(self.k_points)
-        x_s, y_s, z_s = Point.extract_from_ptlist(Point.subtract_elementwise_ptlist(pt_mean, self.k_points))
+    def mini_batch(
+            self,
+            batch_size: int = 1024,
+            max_batches: int = 1000,
+            tolerance: float = 1e-4,
+            chunks=None,
+            seed: str | int | None = None,
+            window: int = 10) -> dict[str, float]:
+        # At most max_batches random batches of the points, or shuffled batches of every chunk of a
+        # stream of point chunks. The shift is measured over the last window batches
+        if batch_size <= 0:
+            raise ValueError("Batch size must be greater than 0")
+        rng = np.random.default_rng(self.seed if seed is None else random.Random(seed).getrandbits(128))
+
+        def sample_points():
+            points = self.point_array if self.point_array is not None else as_array(self.points)
+            for _ in range(max_batches):
+                yield points[rng.integers(0, points.shape[0], batch_size)]
+
+        def split_chunks():
+            for chunk in chunks:
+                chunk = as_array(chunk)
+                order = rng.permutation(chunk.shape[0])
+                for begin in range(0, chunk.shape[0], batch_size):
+                    yield chunk[order[begin:begin + batch_size]]
+
+        # Chunks may be sorted, so a stream is consumed completely and only reported as converged
+        centroids, _, report = minibatch(
+            sample_points() if chunks is None else split_chunks(), as_array(self.k_points), tolerance,
+            stop=chunks is None, window=window)
+        self.k_points = as_points(centroids)
+        self.iterations += report['batches']
+        print(f"Batches: {report['batches']} | Points: {report['points']} | Converged: {report['converged']} | "
+              f"Shift: {report['shift']:.3g} | Points per second: {report['points_per_sec']:.3g}")
+        return report
+
+    def restart(self, n_init: int = 10, max_iter: int = 300, max_workers: int | None = None) -> float:
+        # Independent k-means++ restarts on a process pool, the lowest inertia is kept. The chunked
+        # engine restarts on a sample of SEED_SAMPLE points in memory, then refines the best centroids
+        # over all points chunk by chunk, the returned inertia is the one of the sample
+        if self.engine == 'chunked':
+            points = self.sample_array(np.random.default_rng(self.seed))
+        else:
+            points = self.point_array if self.point_array is not None else as_array(self.points)
+        engine = 'hamerly' if self.engine == 'hamerly' else 'array'
+        best_inertia, centroids, labels, iterations = restarts(
+            points, len(self.k_points), n_init, self.seed, engine, max_iter, max_workers)
+        self.k_points = as_points(centroids)
+        self.iterations += iterations
+        if self.engine == 'chunked':
+            self.run(max_iter=max_iter)
+        else:
+            self.labels = labels
+        if self.assigner is not None:
+            self.assigner = HamerlyAssigner()
+        print(f"Restarts: {n_init} | Best inertia: {best_inertia:.6g} | Iterations: {iterations}")
+        return best_inertia
+
+    def run(self, tolerance: float = 0.0, max_iter: int = 300, callback=None, record: bool = False) -> bool:
+        # Distribute and average until no centroid moves further than the tolerance, 0 waits
+        # for exactly equal centroids. The callback gets (iteration, k_points, pt_mean, k_lists)
+        # of every iteration, record keeps them in self.history to render them afterwards
+        if tolerance < 0 or max_iter <= 0:
+            raise ValueError("Tolerance must be positive and max iterations greater than 0")
+        for _ in range(max_iter):
+            self.iterations += 1
+            self.k_distribute()
+            pt_mean = self.k_mean()
+            shift = max(m_pt.distance(k_pt) for m_pt, k_pt in zip(pt_mean, self.k_points))
+            frame = (self.iterations, self.k_points, pt_mean, self.k_lists)
+            if callback is not None:
+                callback(*frame)
+            if record:
+                self.history.append(frame)
+            self.k_points = pt_mean
+            if shift <= tolerance:
+                return True
+        return False
+
+    @property
+    def fig(self):
+        if self._fig is None:
+            import matplotlib.pyplot as plt
+
+            self._fig = plt.figure()
+            self._fig.add_subplot(projection='3d')
+        return self._fig
+
+    @property
+    def ax(self):
+        return self.fig.axes[0]
+
+    def render(self, iteration: int, k_points: list[Point], pt_mean: list[Point], k_lists, rotate: bool = True) -> None:
+        import matplotlib.pyplot as plt
+
+        print(f"Current points: {k_points}\nTarget points: {pt_mean}\nIterations: {iteration}")
+        colors = plt.get_cmap('tab10')
+        x_m, y_m, z_m = Point.extract_from_ptlist(k_points)
+        x_s, y_s, z_s = Point.extract_from_ptlist(Point.subtract_elementwise_ptlist(pt_mean, k_points))
         self.ax.clear()
-        self.ax.scatter(x, y, z, c='#ff00008f')
-        self.ax.scatter(x_2, y_2, z_2, c='#00ff008f')
-        self.ax.scatter(x_3, y_3, z_3, c='#0000ff8f')
+        for index, pt_list in enumerate(k_lists or ()):
+            if len(pt_list):
+                self.ax.scatter(*Point.extract_from_ptlist(pt_list), color=colors(index % colors.N), alpha=0.56)
         self.ax.scatter(x_m, y_m, z_m, c='#000000ff')
         self.ax.quiver(x_m, y_m, z_m, x_s, y_s, z_s, color='#000000ff')
         self.fig.show()
-        str_curr_pts = [x.round_display(2) for x in self.k_points]
+        str_curr_pts = [x.round_display(2) for x in k_points]
         str_next_pts = [x.round_display(2) for x in pt_mean]
-        plt.title(f'Iteration: {self.iterations}\nCurrent points: {str_curr_pts}\nTarget points: {str_next_pts}\n')
-        for angle in range(0, 360 + 1, 3):
+        self.ax.set_title(f'Iteration: {iteration}\nCurrent points: {str_curr_pts}\nTarget points: {str_next_pts}\n')
+        for angle in range(0, 360 + 1, 3) if rotate else (0,):
             # Normalize the angle to the range [-180, 180] for display
             angle_norm = (angle + 180) % 360 - 180
 
@@ -96,17 +271,33 @@ class K_Means:
             self.ax.view_init(elev, azim, roll)
             plt.draw()
             plt.pause(.001)
-        self.k_points = pt_mean
-        if not end:
-            self.rec_mean()
-        else:
-            input('Press enter to stop...')
+
+    def replay(self, rotate: bool = True) -> None:
+        for frame in self.history:
+            self.render(*frame, rotate=rotate)
+
+    def rec_mean(self) -> None:
+        # Kept for the interactive demo, renders every iteration while clustering
+        self.run(callback=self.render)
+        input('Press enter to stop...')
+
+
+def test_array_engine_matches_point_engine() -> None:
+    rpt = RandomPointCloud('test')
+    points = rpt.create(300, biases=(1, 0, 0), dims=3) + rpt.create(300, biases=(0, 1, 0), dims=3)
+    init = rpt.create(4, dims=3)
+    point_km = K_Means(list(init), points, engine='point')
+    array_km = K_Means(list(init), points, engine='array')
+    assert point_km.run() and array_km.run()
+    assert point_km.k_points == array_km.k_points and point_km.iterations == array_km.iterations
+    assert point_km.k_lists == array_km.k_lists
 
 
 if __name__ == '__main__':
     rpt = RandomPointCloud('test_2')
-    tc = rpt.create(100, biases=(1, 0, 0), dims=3)
-    tc.extend(rpt.create(100, biases=(0, 1, 0), dims=3))
-    tc.extend(rpt.create(100, biases=(0, 0, 1), dims=3))
-    km = K_Means(rpt.create(3, dims=2), tc)
+    tc = rpt.create_cloud(100, biases=(1, 0, 0), dims=3)
+    tc.extend(rpt.create_cloud(100, biases=(0, 1, 0), dims=3))
+    tc.extend(rpt.create_cloud(100, biases=(0, 0, 1), dims=3))
+    km = K_Means(3, tc, engine='array', seed='test_2')
+    km.restart(n_init=8)
     km.rec_mean()
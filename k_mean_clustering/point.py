@@ -1,10 +1,12 @@
 #!/usr/bin/env python3.10
 from dataclasses import dataclass
 import math
-from typing import Iterator, Self
+from typing import Iterable, Iterator, Self
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Point:
     x: float = 0.0
     y: float = 0.0
@@ -63,7 +65,9 @@ class Point:
         return round(self.x, digits), round(self.y, digits), round(self.z, digits)
 
     @staticmethod
-    def extract_from_ptlist(pt_list: list[Self]) -> tuple:
+    def extract_from_ptlist(pt_list: 'list[Self] | PointCloud') -> tuple:
+        if isinstance(pt_list, PointCloud):
+            return [pt_list.x, pt_list.y, pt_list.z]
         return list(zip(*[(*x,) for x in pt_list]))
 
     @staticmethod
@@ -74,5 +78,56 @@ class Point:
         return ret
 
 
+class PointCloud:
+    # Struct of arrays, one row (x, y, z) per point
+    __slots__ = ('data',)
+
+    def __init__(self, data: np.ndarray | None = None) -> None:
+        self.data = np.empty((0, 3)) if data is None else np.asarray(data, dtype=np.float64).reshape(-1, 3)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> Self:
+        return cls(np.array([(*point,) for point in points], dtype=np.float64))
+
+    @classmethod
+    def concatenate(cls, clouds: Iterable[Self]) -> Self:
+        return cls(np.concatenate([cloud.data for cloud in clouds]))
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, index: int | slice | np.ndarray) -> Point | Self:
+        if isinstance(index, (int, np.integer)):
+            return Point(*self.data[index].tolist())
+        # Slices share the memory of this cloud, index arrays and masks copy
+        return PointCloud(self.data[index])
+
+    def __iter__(self) -> Iterator[Point]:
+        for row in self.data.tolist():
+            yield Point(*row)
+
+    def __repr__(self) -> str:
+        return f'PointCloud(n={len(self)})'
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    def extend(self, other: 'Self | Iterable[Point]') -> None:
+        other = other if isinstance(other, PointCloud) else PointCloud.from_points(other)
+        self.data = np.concatenate((self.data, other.data))
+
+    def to_points(self) -> list[Point]:
+        return list(self)
+
+
 if __name__ == "__main__":
     pass
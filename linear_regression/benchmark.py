@@ -0,0 +1,189 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+# Rendering is benchmarked off screen, the backend has to be set before pyplot is imported
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# The shared benchmark helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_tools import measure, run_cli  # noqa: E402
+from linearregresssion import LinearRegression, generate_random_data  # noqa: E402
+
+HIGHER_IS_BETTER = ('calls_per_sec', 'points_per_sec')
+
+# Iterations depend only on the data and the algorithm, every increase is a regression
+EXACT = ('iterations',)
+
+STRATEGIES = ('solve', 'halving', 'golden', 'newton')
+
+
+def setup_case(size: int, noise: float, seed: int) -> np.ndarray:
+    """Create seeded data with slope 1 around the index.
+
+    Args:
+        size (int): number of data points
+        noise (float): uniform noise relative to the range of the data
+        seed (int): seed for the data
+
+    Returns:
+        np.ndarray: y values
+    """
+    return generate_random_data(seed, size, 0, size, lambda x: x, noise=noise * size)
+
+
+def bench_init(data: np.ndarray) -> dict[str, float]:
+    """Benchmark creating a regression, which guesses the start and sums up the data.
+
+    Args:
+        data (np.ndarray): y values
+
+    Returns:
+        dict[str, float]: wall time, points per second and peak memory
+    """
+    def run() -> float:
+        LinearRegression(data, headless=True)
+        return data.size
+
+    points, seconds, peak = measure(run)
+    return {'seconds': seconds, 'points_per_sec': points / seconds, 'peak_bytes': peak}
+
+
+def bench_calc_current_error(data: np.ndarray, calls: int) -> dict[str, float]:
+    """Benchmark the error of a slope on the data of the regression.
+
+    Args:
+        data (np.ndarray): y values
+        calls (int): number of calls
+
+    Returns:
+        dict[str, float]: wall time, calls per second and peak memory
+    """
+    linreg = LinearRegression(data, headless=True)
+
+    def run() -> float:
+        for call in range(calls):
+            linreg.calc_current_error(1.0 + call / calls)
+        return calls
+
+    calls, seconds, peak = measure(run)
+    return {'seconds': seconds, 'calls_per_sec': calls / seconds, 'peak_bytes': peak}
+
+
+def bench_fit(data: np.ndarray, strategy: str) -> dict[str, float]:
+    """Benchmark a full fit, including the creation of the regression.
+
+    Args:
+        data (np.ndarray): y values
+        strategy (str): 'solve' or a strategy of recursive_approx
+
+    Returns:
+        dict[str, float]: wall time, iterations, fitted slope and peak memory
+    """
+    result = {}
+
+    def run() -> float:
+        linreg = LinearRegression(data, headless=True)
+        if strategy == 'solve':
+            slope, _, iterations = linreg.solve()
+        else:
+            slope, _, iterations = linreg.recursive_approx(strategy=strategy)
+        result['slope'] = slope
+        return iterations
+
+    iterations, seconds, peak = measure(run)
+    return {'seconds': seconds, 'iterations': iterations, 'slope': result['slope'], 'peak_bytes': peak}
+
+
+def bench_render_diagram(data: np.ndarray, calls: int) -> dict[str, float]:
+    """Benchmark building the diagram and updating it afterwards.
+
+    Args:
+        data (np.ndarray): y values
+        calls (int): number of updates
+
+    Returns:
+        dict[str, float]: wall time of the first render, updates per second and peak memory
+    """
+    import matplotlib.pyplot as plt
+
+    linreg = LinearRegression(data, headless=True)
+    slope = linreg.recursive_approx()[0]
+    start = time.perf_counter()
+    linreg.render_diagram(slope)
+    first_seconds = time.perf_counter() - start
+
+    def run() -> float:
+        for call in range(calls):
+            linreg.render_diagram(slope * (1 + 0.001 * call / calls))
+        return calls
+
+    calls, seconds, peak = measure(run)
+    plt.close(linreg.plot)
+    return {'seconds': first_seconds, 'calls_per_sec': calls / seconds, 'peak_bytes': peak}
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run all benchmarks for every data size and noise level.
+
+    Args:
+        args (argparse.Namespace): arguments
+
+    Returns:
+        dict[str, dict[str, float]]: metrics per benchmark case
+    """
+    results = {}
+    for size in args.sizes:
+        for noise in args.noises:
+            case = f'n{size}/noise{noise:.2f}'
+            print(f'Running {case}...')
+            data = setup_case(size, noise, args.seed)
+            results[f'init/{case}'] = bench_init(data)
+            results[f'calc_current_error/{case}'] = bench_calc_current_error(data, args.calls)
+            for strategy in args.strategies:
+                results[f'fit/{strategy}/{case}'] = bench_fit(data, strategy)
+            if size <= args.render_max:
+                results[f'render_diagram/{case}'] = bench_render_diagram(data, args.render_calls)
+    return results
+
+
+def sanity_check_args(args: argparse.Namespace) -> None:
+    """Sanity check the arguments.
+
+    Args:
+        args (argparse.Namespace): arguments
+
+    Raises:
+        ValueError: if the arguments are invalid
+    """
+    if any(size < 2 for size in args.sizes):
+        raise ValueError("Sizes must be at least 2")
+    if any(noise <= 0 for noise in args.noises):
+        raise ValueError("Noise levels must be greater than 0, the halving strategy divides by the error")
+    if args.calls <= 0 or args.render_calls <= 0:
+        raise ValueError("Calls must be greater than 0")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the linear regression.')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[10**2, 10**4, 10**6],
+                        help='Numbers of data points, e.g. 100 10000 1000000 10000000')
+    parser.add_argument('-n', '--noises', type=float, nargs='+', default=[0.01, 0.1, 0.5],
+                        help='Noise levels relative to the range of the data')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the data')
+    parser.add_argument('-c', '--calls', type=int, default=1000, help='Calls for calc_current_error')
+    parser.add_argument('-a', '--strategies', type=str, nargs='+', choices=STRATEGIES, default=list(STRATEGIES),
+                        help='Fit strategies')
+    parser.add_argument('--render-max', type=int, default=10**5, help='Largest size to render')
+    parser.add_argument('--render-calls', type=int, default=20, help='Updates for render_diagram')
+    logging.disable(logging.INFO)
+    run_cli(parser, run_benchmarks, sanity_check_args, HIGHER_IS_BETTER, exact=EXACT)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,458 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import logging
 import random
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+# Pyplot is slow to import and only needed to render, it is loaded on first use
+if TYPE_CHECKING:
+    from matplotlib.artist import Artist
+    from matplotlib.figure import Figure
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+INV_GOLDEN_RATIO: float = (5 ** 0.5 - 1) / 2
+
+
+@dataclass
+class SufficientStats:
+    """Sums over the data which define the squared error of a line through the origin.
+
+    E(m) = sum((y - m * x)^2) = sum_yy - 2 * m * sum_xy + m^2 * sum_xx
+
+    The plain sums of x and y allow to shift the x values afterwards,
+    so partial sums of consecutive data can be merged.
+    """
+    n: int = 0
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xx: float = 0.0
+    sum_xy: float = 0.0
+    sum_yy: float = 0.0
+
+    @classmethod
+    def from_data(cls, data: list[float | int] | np.ndarray, start: int = 0) -> 'SufficientStats':
+        """Calculate the sums in one vectorized pass.
+
+        Args:
+            data (list[float | int] | np.ndarray):
+                List containing y values. Indicies will be x values.
+
+            start (int, optional):
+                x value of the first y value. Defaults to 0.
+
+        Returns:
+            SufficientStats: sums of the data.
+        """
+        y_val: np.ndarray = np.asarray(data, dtype=np.float64)
+        x_val: np.ndarray = np.arange(start, start + y_val.size, dtype=np.float64)
+        return cls.from_xy(x_val, y_val)
+
+    @classmethod
+    def from_xy(cls, x_val: np.ndarray, y_val: np.ndarray) -> 'SufficientStats':
+        """Calculate the sums of explicit x and y values in one vectorized pass.
+
+        Args:
+            x_val (np.ndarray): x values.
+            y_val (np.ndarray): y values.
+
+        Returns:
+            SufficientStats: sums of the data.
+        """
+        x_val = np.asarray(x_val, dtype=np.float64)
+        y_val = np.asarray(y_val, dtype=np.float64)
+        return cls(
+            n=int(y_val.size),
+            sum_x=float(x_val.sum()),
+            sum_y=float(y_val.sum()),
+            sum_xx=float(x_val @ x_val),
+            sum_xy=float(x_val @ y_val),
+            sum_yy=float(y_val @ y_val))
+
+    def __add__(self, other: 'SufficientStats') -> 'SufficientStats':
+        return SufficientStats(
+            n=self.n + other.n,
+            sum_x=self.sum_x + other.sum_x,
+            sum_y=self.sum_y + other.sum_y,
+            sum_xx=self.sum_xx + other.sum_xx,
+            sum_xy=self.sum_xy + other.sum_xy,
+            sum_yy=self.sum_yy + other.sum_yy)
+
+    def shift(self, offset: float) -> 'SufficientStats':
+        """Sums as if every x value was larger by the offset.
+
+        Args:
+            offset (float): offset added to the x values.
+
+        Returns:
+            SufficientStats: shifted sums.
+        """
+        return SufficientStats(
+            n=self.n,
+            sum_x=self.sum_x + self.n * offset,
+            sum_y=self.sum_y,
+            sum_xx=self.sum_xx + 2 * offset * self.sum_x + self.n * offset * offset,
+            sum_xy=self.sum_xy + offset * self.sum_y,
+            sum_yy=self.sum_yy)
+
+    def error(self, slope: float) -> float:
+        """Squared error of the line with the given slope in O(1).
+
+        The expanded form subtracts sums of the size of sum_yy, so the absolute
+        rounding error is about 1e-16 * sum_yy. For large n and a good fit the
+        error is far smaller than sum_yy and loses most of its digits, even the
+        sign. It is clamped at 0 and compares slopes reliably only while their
+        errors differ by more than that, recompute it from the data if exact
+        residuals are needed.
+
+        Args:
+            slope (float): slope of the line.
+
+        Returns:
+            float: Error squared of distance to line.
+        """
+        # Cancellation can push the error of a (nearly) perfect fit below 0
+        return max(0.0, self.sum_yy - 2 * slope * self.sum_xy + slope * slope * self.sum_xx)
+
+    def solve(self) -> float:
+        """Least squares slope, where the derivative of the error is 0.
+
+        Returns:
+            float: optimal slope, 0 if there is no data.
+        """
+        if self.sum_xx == 0:
+            return 0.0
+        return self.sum_xy / self.sum_xx
+
+
+def stats_from_chunks(chunks: Iterable[np.ndarray], start: int = 0) -> SufficientStats:
+    """Accumulate the sums over chunks of data in one pass.
+
+    Args:
+        chunks (Iterable[np.ndarray]):
+            Chunks of y values, the indices continue over the chunks.
+            Chunks with two columns are explicit (x, y) pairs instead.
+
+        start (int, optional):
+            x value of the first y value. Defaults to 0.
+
+    Returns:
+        SufficientStats: sums of all chunks.
+    """
+    stats: SufficientStats = SufficientStats()
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 2 and chunk.shape[1] == 2:
+            stats += SufficientStats.from_xy(chunk[:, 0], chunk[:, 1])
+        else:
+            stats += SufficientStats.from_data(chunk.ravel(), start + stats.n)
+    return stats
+
+
+def iter_file_chunks(path: str, chunk_size: int = 1_000_000, skip_header: int = 0) -> Iterator[np.ndarray]:
+    """Read a .npy or CSV file in chunks of rows, a .npy file is memory-mapped.
+
+    Args:
+        path (str):
+            Path to a .npy file or a comma separated text file with
+            one column (y) or two columns (x, y).
+
+        chunk_size (int, optional):
+            Rows per chunk. Defaults to 1_000_000.
+
+        skip_header (int, optional):
+            Lines to skip at the start of a CSV file. Defaults to 0.
+
+    Returns:
+        Iterator[np.ndarray]: chunks of the file.
+    """
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be positive.')
+    if path.endswith('.npy'):
+        data: np.ndarray = np.load(path, mmap_mode='r')
+        for begin in range(0, data.shape[0], chunk_size):
+            yield np.array(data[begin:begin + chunk_size], dtype=np.float64)
+        return
+    with open(path) as file:
+        for _ in range(skip_header):
+            next(file, None)
+        while lines := list(itertools.islice(file, chunk_size)):
+            yield np.loadtxt(lines, delimiter=',', dtype=np.float64, ndmin=2)
+
+
+def stats_from_file(path: str, chunk_size: int = 1_000_000, start: int = 0, skip_header: int = 0) -> SufficientStats:
+    """Accumulate the sums over a file with bounded memory.
+
+    Args:
+        path (str): Path to a .npy or CSV file, see iter_file_chunks.
+        chunk_size (int, optional): Rows per chunk. Defaults to 1_000_000.
+        start (int, optional): x value of the first y value. Defaults to 0.
+        skip_header (int, optional): Lines to skip at the start of a CSV file. Defaults to 0.
+
+    Returns:
+        SufficientStats: sums of the file.
+    """
+    return stats_from_chunks(iter_file_chunks(path, chunk_size, skip_header), start)
+
+
+def merge_stats(stats: Iterable[SufficientStats], consecutive: bool = True) -> SufficientStats:
+    """Merge partial sums, e.g. of several files.
+
+    Args:
+        stats (Iterable[SufficientStats]):
+            Partial sums.
+
+        consecutive (bool, optional):
+            The parts were indexed from 0 each and continue each other,
+            so every part is shifted behind the previous ones.
+            Use False for explicit x values, shifting them moves the data.
+            Defaults to True.
+
+    Returns:
+        SufficientStats: merged sums.
+    """
+    merged: SufficientStats = SufficientStats()
+    for part in stats:
+        merged += part.shift(merged.n) if consecutive else part
+    return merged
+
+
+def fit_stream(chunks: Iterable[np.ndarray], start: int = 0) -> tuple[float, float, int]:
+    """Fit the slope over a stream of chunks in one pass with bounded memory.
+
+    Args:
+        chunks (Iterable[np.ndarray]): Chunks of data, see stats_from_chunks.
+        start (int, optional): x value of the first y value. Defaults to 0.
+
+    Returns:
+        tuple[float, float, int]:
+            Optimal slope, its error, number of data points
+    """
+    stats: SufficientStats = stats_from_chunks(chunks, start)
+    slope: float = stats.solve()
+    return (slope, stats.error(slope), stats.n)
+
+
+def fit_files(paths: Iterable[str], chunk_size: int = 1_000_000, consecutive: bool = True) -> tuple[float, float, int]:
+    """Fit the slope over several files, one pass over each.
+
+    Args:
+        paths (Iterable[str]): Paths to .npy or CSV files, see iter_file_chunks.
+        chunk_size (int, optional): Rows per chunk. Defaults to 1_000_000.
+        consecutive (bool, optional):
+            Files with one column continue each others indices like in
+            MiniBatchRegression.fit_files, files with two columns keep their
+            x values. If False, every one column file is indexed from 0.
+            Defaults to True.
+
+    Returns:
+        tuple[float, float, int]:
+            Optimal slope, its error, number of data points
+    """
+    if consecutive:
+        # One stream over all files, only chunks without x values continue the indices
+        stats: SufficientStats = stats_from_chunks(itertools.chain.from_iterable(
+            iter_file_chunks(path, chunk_size) for path in paths))
+    else:
+        stats = merge_stats((stats_from_file(path, chunk_size) for path in paths), consecutive=False)
+    slope: float = stats.solve()
+    return (slope, stats.error(slope), stats.n)
+
+
+def fit_batch(
+        data: np.ndarray,
+        strategy: str = 'solve',
+        break_margin: float = 0.01,
+        max_iterations: int = 10000
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit many series of the same length at once without one object per series.
+
+    Args:
+        data (np.ndarray):
+            2D array of y values, one series per row.
+            Indicies will be x values.
+
+        strategy (str, optional):
+            'solve' for the exact least squares fit, or 'halving' for the
+            step width search of LinearRegression.recursive_approx with
+            guessed initial slope and step width. Defaults to 'solve'.
+
+        break_margin (float, optional):
+            Break margin of the 'halving' strategy. Defaults to 0.01.
+
+        max_iterations (int, optional):
+            Max iterations of the 'halving' strategy. Defaults to 10000.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]:
+            Slopes, errors and iterations per series
+    """
+    y_val: np.ndarray = np.atleast_2d(np.asarray(data, dtype=np.float64))
+    x_val: np.ndarray = np.arange(y_val.shape[1], dtype=np.float64)
+    sum_xx: float = float(x_val @ x_val)
+    sum_xy: np.ndarray = y_val @ x_val
+    sum_yy: np.ndarray = np.einsum('ij,ij->i', y_val, y_val)
+
+    def errors(slopes: np.ndarray, rows: np.ndarray | slice = slice(None)) -> np.ndarray:
+        return np.maximum(0.0, sum_yy[rows] - 2 * slopes * sum_xy[rows] + slopes * slopes * sum_xx)
+
+    if strategy == 'solve':
+        slopes: np.ndarray = sum_xy / sum_xx if sum_xx > 0 else np.zeros(y_val.shape[0])
+        return slopes, errors(slopes), np.ones(y_val.shape[0], dtype=np.int64)
+    if strategy != 'halving':
+        raise ValueError(f'Unknown strategy {strategy}, use one of [\'solve\', \'halving\'].')
+
+    # Same guesses and update rules as LinearRegression, applied to all unconverged series at once
+    upper_margin: float = 1.0 + break_margin
+    lower_margin: float = 1.0 - break_margin
+    slopes = y_val.max(axis=1) / y_val.shape[1]
+    stepws: np.ndarray = slopes * 0.1
+    curr_errors: np.ndarray = errors(slopes)
+    last_fracs: np.ndarray = np.zeros(y_val.shape[0])
+    iterations: np.ndarray = np.zeros(y_val.shape[0], dtype=np.int64)
+    active: np.ndarray = np.arange(y_val.shape[0])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(max_iterations):
+            if active.size == 0:
+                break
+            slopes[active] += stepws[active]
+            last_errors: np.ndarray = curr_errors[active]
+            curr_errors[active] = errors(slopes[active], active)
+            diffs: np.ndarray = last_errors - curr_errors[active]
+            fracs: np.ndarray = curr_errors[active] / last_errors
+            stepws[active] = np.where(diffs < 0, stepws[active] / -2, stepws[active])
+            iterations[active] += 1
+            converged: np.ndarray = (
+                (upper_margin > fracs) & (fracs > lower_margin)
+                & (upper_margin > last_fracs[active]) & (last_fracs[active] > lower_margin))
+            last_fracs[active] = fracs
+            active = active[~converged]
+    return slopes, curr_errors, iterations
+
+
+# Sum terms of a bootstrap worker process, sent once per process instead of once per block
+_worker_sum_terms: np.ndarray | None = None
+
+
+def _init_bootstrap_worker(sum_terms: np.ndarray) -> None:
+    """Keep the sum terms in a worker process for all of its blocks.
+
+    Args:
+        sum_terms (np.ndarray): x * x and x * y per data point, shape (2, n).
+    """
+    global _worker_sum_terms
+    _worker_sum_terms = sum_terms
+
+
+def _bootstrap_block(seed: np.random.SeedSequence, size: int, sum_terms: np.ndarray | None = None) -> np.ndarray:
+    """Slopes of one block of bootstrap resamples.
+
+    Args:
+        seed (np.random.SeedSequence): seed of the block.
+        size (int): number of resamples in the block.
+        sum_terms (np.ndarray | None, optional): x * x and x * y per data point,
+            shape (2, n). If None, the sum terms of the worker process. Defaults to None.
+
+    Returns:
+        np.ndarray: slope per resample.
+    """
+    sum_terms = _worker_sum_terms if sum_terms is None else sum_terms
+    rng: np.random.Generator = np.random.default_rng(seed)
+    indices: np.ndarray = rng.integers(0, sum_terms.shape[1], size=(size, sum_terms.shape[1]))
+    sum_xx: np.ndarray = sum_terms[0][indices].sum(axis=1)
+    sum_xy: np.ndarray = sum_terms[1][indices].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sum_xx > 0, sum_xy / sum_xx, 0.0)
+
+
+def bootstrap_slope(
+        data: list[float | int] | np.ndarray,
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        seed: str | int | None = None,
+        block_size: int | None = None,
+        max_workers: int | None = 1
+        ) -> tuple[float, float, float]:
+    """Percentile bootstrap confidence interval of the least squares slope.
+
+    Resamples are drawn as index blocks and fitted through their sufficient
+    statistics. Every block gets its own child of one seed sequence, so the
+    result only depends on the seed and the block size, not on the workers.
+
+    Args:
+        data (list[float | int] | np.ndarray):
+            y values. Indicies will be x values.
+
+        n_resamples (int, optional):
+            Number of resamples. Defaults to 1000.
+
+        confidence (float, optional):
+            Confidence level of the interval. Defaults to 0.95.
+
+        seed (str | int | None, optional):
+            random seed, to produce the same interval. Defaults to None.
+
+        block_size (int | None, optional):
+            Resamples per block, a block holds block_size * n indices.
+            If None, blocks hold about 4 million indices. Defaults to None.
+
+        max_workers (int | None, optional):
+            Processes to spread the blocks over, 1 runs in this process
+            and None uses all CPUs. Defaults to 1.
+
+    Returns:
+        tuple[float, float, float]:
+            Slope of the data, lower and upper bound of the interval
+    """
+    if not 0 < confidence < 1:
+        raise ValueError('Confidence must be in (0, 1).')
+    if n_resamples <= 0:
+        raise ValueError('Number of resamples must be positive.')
+    y_val: np.ndarray = np.asarray(data, dtype=np.float64)
+    if y_val.size == 0:
+        raise ValueError('Data must not be empty.')
+    x_val: np.ndarray = np.arange(y_val.size, dtype=np.float64)
+    sum_terms: np.ndarray = np.stack((x_val * x_val, x_val * y_val))
+    if block_size is None:
+        block_size = max(1, (1 << 22) // y_val.size)
+    if block_size <= 0:
+        raise ValueError('Block size must be positive.')
+
+    sizes: list[int] = [min(block_size, n_resamples - begin) for begin in range(0, n_resamples, block_size)]
+    seeds: list[np.random.SeedSequence] = np.random.SeedSequence(
+        seed_to_int(seed) if isinstance(seed, str) else seed).spawn(len(sizes))
+    if max_workers == 1 or len(sizes) == 1:
+        blocks: list[np.ndarray] = [_bootstrap_block(block_seed, size, sum_terms) for block_seed, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers, initializer=_init_bootstrap_worker, initargs=(sum_terms,)) as executor:
+            blocks = list(executor.map(_bootstrap_block, seeds, sizes))
+
+    alpha: float = (1 - confidence) / 2
+    lower, upper = np.quantile(np.concatenate(blocks), [alpha, 1 - alpha])
+    return (SufficientStats.from_data(y_val).solve(), float(lower), float(upper))
+
 
 class LinearRegression():
 
-    def __init__(self, data: list[float | int], initial_slope: float | None = None, initial_stepw: float | None = None) -> None:
+    def __init__(
+            self,
+            data: list[float | int],
+            initial_slope: float | None = None,
+            initial_stepw: float | None = None,
+            headless: bool = False,
+            progress: Callable[[int, float, float], None] | None = None
+            ) -> None:
         """Tools to solve linear regression in uniform data.
 
+        Iteration progress is logged at INFO level to the module logger.
+
         Args:
             data (list[float  |  int]):
                 list containing y values. Indicies will be x values.
@@ -23,22 +466,57 @@ class LinearRegression():
                 If no initial step width for the algorithm is given,
                 the value will be automatically determined.
                 Defaults to None.
+
+            headless (bool, optional):
+                Never render from recursive_approx, the figure is only
+                created when render_diagram is called directly.
+                Defaults to False.
+
+            progress (Callable[[int, float, float], None] | None, optional):
+                Called after every iteration with iteration, slope and error.
+                Defaults to None.
         """
         self._data: list[float | int] = data
+        self._stats: SufficientStats = SufficientStats.from_data(data)
 
         self._init_slope: float = self.guess_initial_slope() if initial_slope is None else initial_slope
         self._curr_slope: float = self._init_slope
         self._init_stepw: float = self.guess_initial_stepw(self._init_slope) if initial_stepw is None else initial_stepw
         self._curr_stepw: float = self._init_stepw
 
-        self._slope_errors: list[tuple[float, float]] = []
+        self._slope_errors: np.ndarray = np.empty((64, 2), dtype=np.float64)
+        self._num_slope_errors: int = 0
         self._last_error: float = float()
         self._curr_error: float = self.calc_current_error(self._curr_slope)
 
         self._last_frac: float = 0
         self._iterations: int = 0
+        self._bracket: tuple[float, float, float, float] | None = None
+        self._strategies: dict[str, Callable[[float, float | None], bool]] = {
+            'halving': self.step_halving,
+            'golden': self.step_golden,
+            'newton': self.step_newton
+        }
+
+        self._headless: bool = headless
+        self._progress: Callable[[int, float, float], None] | None = progress
+        self._plot: Figure | None = None
+        self._artists: dict[str, Artist] | None = None
+        self._background: object | None = None
+        self._x_values: np.ndarray | None = None
+
+    @property
+    def plot(self) -> Figure:
+        """Figure of the diagrams, created on first use.
 
-        self._plot = plt.figure("Linear Regression")
+        Returns:
+            Figure: figure.
+        """
+        if self._plot is None:
+            import matplotlib.pyplot as plt
+
+            self._plot = plt.figure("Linear Regression")
+        return self._plot
 
     def guess_initial_slope(self, data: list[float | int] | None = None) -> float:
         """Uses the maximum value and length of data combined as slope.
@@ -93,11 +571,41 @@ class LinearRegression():
         Returns:
             float: Error squared of distance to line.
         """
-        error: float = 0.0
-        y_val: int | float
-        for x_val, y_val in enumerate(self._data if data is None else data):
-            error += (y_val - x_val * current_slope)**2
-        return error
+        stats: SufficientStats = self._stats if data is None else SufficientStats.from_data(data)
+        return stats.error(current_slope)
+
+    def solve(self) -> tuple[float, float, int]:
+        """Exact least squares fit from the precomputed sums.
+
+        Returns:
+            tuple[float, float, int]:
+                Optimal slope, its error, iterations
+        """
+        self._curr_slope = self._stats.solve()
+        self._curr_error = self._stats.error(self._curr_slope)
+        self.append_slope_error(self._curr_slope, self._curr_error)
+        return (self._curr_slope, self._curr_error, 1)
+
+    def bootstrap(
+            self,
+            n_resamples: int = 1000,
+            confidence: float = 0.95,
+            seed: str | int | None = None,
+            max_workers: int | None = 1
+            ) -> tuple[float, float, float]:
+        """Percentile bootstrap confidence interval of the slope, see bootstrap_slope.
+
+        Args:
+            n_resamples (int, optional): Number of resamples. Defaults to 1000.
+            confidence (float, optional): Confidence level. Defaults to 0.95.
+            seed (str | int | None, optional): random seed. Defaults to None.
+            max_workers (int | None, optional): Processes, None uses all CPUs. Defaults to 1.
+
+        Returns:
+            tuple[float, float, float]:
+                Slope of the data, lower and upper bound of the interval
+        """
+        return bootstrap_slope(self._data, n_resamples, confidence, seed, max_workers=max_workers)
 
     def calc_next_stepw(self, old_stepw: float, error_diff: float) -> float:
         """Calculate next step width.
@@ -136,32 +644,23 @@ class LinearRegression():
         frac: float = _curr_error / _last_error
         return (diff, frac)
 
-    def recursive_approx(self, stepping: int | None = None, break_margin: float = 0.01) -> tuple[float, float, int]:
-        """Pseudo-recursivly iterate over data and modify regression.
+    def step_halving(self, break_margin: float, tolerance: float | None) -> bool:
+        """One iteration of the step width search, the step width halves and turns around when the error grows.
 
         Args:
-            stepping (int | None, optional):
-                Number representing after how many steps the method
-                should render the output to a plot.
-                Defaults to None.
+            break_margin (float):
+                Margin from 1 where the ratios of the last two
+                current/previous errors must lie in to converge.
 
-            break_margin (float, optional):
-                Number representing the margin from 1,
-                where the error ratio of the 2 last current/previous
-                error must lie in.
-                Defaults to 0.01.
+            tolerance (float | None):
+                Additionally converge when the step width falls below.
 
         Returns:
-            tuple[float, float, int]:
-                Current slope, current error, iterations
+            bool: True if converged.
         """
         _upper_margin: float = 1.0 + break_margin
         _lower_margin: float = 1.0 - break_margin
 
-        # Clear slope-error list on first run
-        if self._iterations == 0:
-            self._slope_errors.clear()
-
         # Modify slope with stepwidth
         self._curr_slope += self._curr_stepw
 
@@ -170,73 +669,538 @@ class LinearRegression():
         self._curr_error = self.calc_current_error(self._curr_slope)
 
         # Add slope-error pair to list
-        self._slope_errors.append((self._curr_slope, self._curr_error))
+        self.append_slope_error(self._curr_slope, self._curr_error)
 
         # Get error stats
         diff, frac = self.comp_errors()
         self._curr_stepw = self.calc_next_stepw(self._curr_stepw, diff)
-        print(f'Slope: {self._curr_slope}, Stepwidth: {self._curr_stepw},  Error: {self._curr_error}, diff: {diff}, frac: {frac}')
-
-        # Modulo to show only every x steps
-        if stepping is not None and isinstance(stepping, int | float):
-            if stepping > 0:
-                if self._iterations % stepping == 0 and self._iterations > 0:
-                    self.render_diagram(self._curr_slope)
-                    input(f'Press any key for next iteration ({self._iterations + 1}).')
-        self._iterations += 1
+        logger.info('Slope: %s, Stepwidth: %s,  Error: %s, diff: %s, frac: %s', self._curr_slope, self._curr_stepw, self._curr_error, diff, frac)
 
         # Breaking condition
         if _upper_margin > frac > _lower_margin and _upper_margin > self._last_frac > _lower_margin:
-            self.render_diagram(self._curr_slope)
-            iters: int = self._iterations
-            self._iterations = 0
-            return (self._curr_slope, self._curr_error, iters)
+            return True
+        self._last_frac = frac
+        return tolerance is not None and abs(self._curr_stepw) < tolerance
+
+    def step_golden(self, break_margin: float, tolerance: float | None) -> bool:
+        """One iteration of the golden-section search.
+
+        The first iteration brackets the minimum by doubling the step width
+        around the current slope, every further iteration shrinks the bracket
+        by the golden ratio.
+
+        Args:
+            break_margin (float):
+                Unused, the search converges on the bracket width.
+
+            tolerance (float | None):
+                Converge when the bracket is narrower.
+                If None, 1e-9 of the slope magnitude (at least 1e-9).
+
+        Returns:
+            bool: True if converged.
+        """
+        if self._bracket is None:
+            self._bracket = self.bracket_minimum(self._curr_slope, self._curr_stepw)
+        lower, inner_lower, inner_upper, upper = self._bracket
+        error_lower: float = self.calc_current_error(inner_lower)
+        error_upper: float = self.calc_current_error(inner_upper)
+        if error_lower < error_upper:
+            upper, inner_upper = inner_upper, inner_lower
+            inner_lower = upper - INV_GOLDEN_RATIO * (upper - lower)
         else:
-            self._last_frac = frac
-            return self.recursive_approx(stepping)
+            lower, inner_lower = inner_lower, inner_upper
+            inner_upper = lower + INV_GOLDEN_RATIO * (upper - lower)
+        self._bracket = (lower, inner_lower, inner_upper, upper)
 
-    def render_diagram(self, slope: float) -> None:
-        """Plots of data and regression, as well as errors to stepwidth.
+        self._last_error = self._curr_error
+        self._curr_slope = (lower + upper) / 2
+        self._curr_error = self.calc_current_error(self._curr_slope)
+        self.append_slope_error(self._curr_slope, self._curr_error)
+        logger.info('Slope: %s, Bracket: %s,  Error: %s', self._curr_slope, upper - lower, self._curr_error)
+
+        _tolerance: float = 1e-9 * max(1.0, abs(self._curr_slope)) if tolerance is None else tolerance
+        if upper - lower < _tolerance:
+            self._bracket = None
+            return True
+        return False
+
+    def step_newton(self, break_margin: float, tolerance: float | None) -> bool:
+        """One Newton iteration on the quadratic error, which lands on the optimum in one step.
 
         Args:
-            slope (float): current slope.
+            break_margin (float):
+                Unused, the search converges on the slope change.
+
+            tolerance (float | None):
+                Converge when the slope changes less.
+                If None, 1e-12 of the slope magnitude (at least 1e-12).
+
+        Returns:
+            bool: True if converged.
         """
-        self._plot.clf()
+        # E'(m) = 2 * (m * sum_xx - sum_xy), E''(m) = 2 * sum_xx
+        last_slope: float = self._curr_slope
+        if self._stats.sum_xx > 0:
+            self._curr_slope = last_slope - (last_slope * self._stats.sum_xx - self._stats.sum_xy) / self._stats.sum_xx
+
+        self._last_error = self._curr_error
+        self._curr_error = self.calc_current_error(self._curr_slope)
+        self.append_slope_error(self._curr_slope, self._curr_error)
+        logger.info('Slope: %s, Change: %s,  Error: %s', self._curr_slope, self._curr_slope - last_slope, self._curr_error)
+
+        _tolerance: float = 1e-12 * max(1.0, abs(self._curr_slope)) if tolerance is None else tolerance
+        return abs(self._curr_slope - last_slope) <= _tolerance
 
-        x_value: np.ndarray = np.array(range(len(self._data)))
-        y_data: np.ndarray = np.array(self._data)
-        y_reg: np.ndarray = np.array([x * slope for x in x_value])
-        sub_1 = plt.subplot(121)
-        sub_1.plot(x_value, y_data, 'r+', x_value, y_reg, 'g-')
+    def bracket_minimum(self, slope: float, stepw: float) -> tuple[float, float, float, float]:
+        """Find an interval around the minimum error and its golden-section points.
+
+        Args:
+            slope (float): slope to start from.
+            stepw (float): initial half width of the interval.
+
+        Returns:
+            tuple[float, float, float, float]: lower bound, inner points, upper bound
+        """
+        initial_width: float = abs(stepw) if stepw != 0 else max(1.0, abs(slope))
+        center_error: float = self.calc_current_error(slope)
+        width: float = initial_width
+        lower: float = slope - width
+        while self.calc_current_error(lower) < center_error:
+            width *= 2
+            lower = slope - width
+        width = initial_width
+        upper: float = slope + width
+        while self.calc_current_error(upper) < center_error:
+            width *= 2
+            upper = slope + width
+        return (
+            lower,
+            upper - INV_GOLDEN_RATIO * (upper - lower),
+            lower + INV_GOLDEN_RATIO * (upper - lower),
+            upper)
+
+    def recursive_approx(
+            self,
+            stepping: int | None = None,
+            break_margin: float = 0.01,
+            strategy: str = 'halving',
+            max_iterations: int = 10000,
+            tolerance: float | None = None
+            ) -> tuple[float, float, int]:
+        """Iterate over data and modify regression until the strategy converges.
+
+        Args:
+            stepping (int | None, optional):
+                Number representing after how many steps the method
+                should render the output to a plot.
+                Defaults to None.
+
+            break_margin (float, optional):
+                Number representing the margin from 1,
+                where the error ratio of the 2 last current/previous
+                error must lie in.
+                Defaults to 0.01.
+
+            strategy (str, optional):
+                Step strategy, one of 'halving', 'golden' or 'newton'.
+                Defaults to 'halving'.
+
+            max_iterations (int, optional):
+                Stop after this many iterations even without convergence.
+                Defaults to 10000.
+
+            tolerance (float | None, optional):
+                Tolerance of the strategy, see the step methods.
+                Defaults to None.
+
+        Returns:
+            tuple[float, float, int]:
+                Current slope, current error, iterations
+        """
+        if strategy not in self._strategies:
+            raise ValueError(f'Unknown strategy {strategy}, use one of {list(self._strategies)}.')
+        if max_iterations <= 0:
+            raise ValueError('Max iterations must be positive.')
+        step: Callable[[float, float | None], bool] = self._strategies[strategy]
+
+        # Clear slope-error list on first run
+        if self._iterations == 0:
+            self.clear_slope_errors()
+            self._bracket = None
+
+        converged: bool = False
+        while not converged and self._iterations < max_iterations:
+            converged = step(break_margin, tolerance)
+            if self._progress is not None:
+                self._progress(self._iterations, self._curr_slope, self._curr_error)
+
+            # Modulo to show only every x steps
+            if stepping is not None and isinstance(stepping, int | float) and not self._headless:
+                if stepping > 0:
+                    if self._iterations % stepping == 0 and self._iterations > 0:
+                        self.render_diagram(self._curr_slope)
+                        input(f'Press any key for next iteration ({self._iterations + 1}).')
+            self._iterations += 1
+
+        if not self._headless:
+            self.render_diagram(self._curr_slope)
+        iters: int = self._iterations
+        self._iterations = 0
+        return (self._curr_slope, self._curr_error, iters)
+
+    @property
+    def slope_errors(self) -> np.ndarray:
+        """Slope-error pairs of the current run.
+
+        Returns:
+            np.ndarray: view with one (slope, error) row per iteration.
+        """
+        return self._slope_errors[:self._num_slope_errors]
+
+    def append_slope_error(self, slope: float, error: float) -> None:
+        """Append a slope-error pair, the buffer doubles when full.
+
+        Args:
+            slope (float): slope.
+            error (float): squared error of the slope.
+        """
+        if self._num_slope_errors == self._slope_errors.shape[0]:
+            grown: np.ndarray = np.empty((2 * self._slope_errors.shape[0], 2), dtype=np.float64)
+            grown[:self._num_slope_errors] = self._slope_errors
+            self._slope_errors = grown
+        self._slope_errors[self._num_slope_errors] = (slope, error)
+        self._num_slope_errors += 1
+
+    def clear_slope_errors(self) -> None:
+        """Forget all slope-error pairs, the buffer is kept."""
+        self._num_slope_errors = 0
+
+    def build_diagram(self) -> None:
+        """Create the static parts of the diagrams and the artists updated by render_diagram."""
+        self.plot.clf()
+        x_value: np.ndarray = np.arange(len(self._data))
+        sub_1 = self.plot.add_subplot(121)
+        sub_1.plot(x_value, self._data, 'r+')
+        regression, = sub_1.plot(x_value, np.zeros(x_value.size), 'g-', animated=True)
         sub_1.grid(True)
-        sub_1.set_title(f'Regression (Iteration = {self._iterations})')
-        self._plot.add_subplot(sub_1)
-
-        m_values: np.ndarray = np.array([])
-        q_values: np.ndarray = np.array([])
-        for m_val, q_val in self._slope_errors:
-            m_values = np.append(m_values, m_val)
-            q_values = np.append(q_values, q_val)
-        perm = m_values.argsort()
-        m_values = m_values[perm]
-        q_values = q_values[perm]
-
-        sub_2 = plt.subplot(122)
-        sub_2.plot(m_values, q_values, 'b.-')
+        sub_1.title.set_animated(True)
+
+        sub_2 = self.plot.add_subplot(122)
+        errors, = sub_2.plot([], [], 'b.-', animated=True)
         sub_2.grid(True)
         sub_2.set_title('Q-Error vs. Slope')
         sub_2.set_ylabel('Q-Error')
         sub_2.set_xlabel('Slope')
-        sub_2.text(
+        text = sub_2.text(
             0.05,
             0.95,
-            f'm = {round(self._curr_slope, 2)}\nF = {round(self._curr_error, 2)}',
+            '',
             horizontalalignment='left',
             verticalalignment='center',
-            transform=sub_2.transAxes)
-        self._plot.add_subplot(sub_2)
+            transform=sub_2.transAxes,
+            animated=True)
+
+        self._x_values = x_value
+        self._artists = {'regression': regression, 'title': sub_1.title, 'errors': errors, 'text': text}
+        self._background = None
+        self.plot.show()
+
+    def render_diagram(self, slope: float) -> None:
+        """Plots of data and regression, as well as errors to stepwidth.
+
+        The figure is built once, later calls only update the line data and
+        blit the changed artists over the cached background. The whole figure
+        is only redrawn when the lines leave the axis limits.
+
+        Args:
+            slope (float): current slope.
+        """
+        if self._artists is None or self._artists['regression'].figure is not self.plot:
+            self.build_diagram()
+
+        self._artists['regression'].set_ydata(self._x_values * slope)
+        self._artists['title'].set_text(f'Regression (Iteration = {self._iterations})')
+        slope_errors: np.ndarray = self.slope_errors
+        ordered: np.ndarray = slope_errors[slope_errors[:, 0].argsort()]
+        self._artists['errors'].set_data(ordered[:, 0], ordered[:, 1])
+        self._artists['text'].set_text(f'm = {round(self._curr_slope, 2)}\nF = {round(self._curr_error, 2)}')
+
+        canvas = self.plot.canvas
+        lines: list = [self._artists['regression'], self._artists['errors']]
+        if self._background is None or not canvas.supports_blit or any(self.outside_limits(line) for line in lines):
+            for line in lines:
+                line.axes.relim()
+                line.axes.autoscale_view()
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.plot.bbox) if canvas.supports_blit else None
+        else:
+            canvas.restore_region(self._background)
+        for artist in self._artists.values():
+            self.plot.draw_artist(artist)
+        if canvas.supports_blit:
+            canvas.blit(self.plot.bbox)
+        canvas.flush_events()
+
+    @staticmethod
+    def outside_limits(line) -> bool:
+        """Check if the data of a line leaves the current axis limits.
 
-        self._plot.show()
+        Args:
+            line (Line2D): line to check.
+
+        Returns:
+            bool: True if the limits have to grow.
+        """
+        x_data: np.ndarray = np.asarray(line.get_xdata())
+        y_data: np.ndarray = np.asarray(line.get_ydata())
+        if x_data.size == 0:
+            return False
+        x_low, x_high = sorted(line.axes.get_xlim())
+        y_low, y_high = sorted(line.axes.get_ylim())
+        return bool(x_data.min() < x_low or x_data.max() > x_high or y_data.min() < y_low or y_data.max() > y_high)
+
+
+def split_features(chunk: np.ndarray, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Split a chunk of a table into a feature matrix and y values.
+
+    Args:
+        chunk (np.ndarray):
+            y values, their indices starting at start are the only feature.
+            Chunks with two or more columns are feature columns followed by y.
+
+        start (int, optional):
+            x value of the first y value of uniform data. Defaults to 0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: features with shape (n, features), y values
+    """
+    chunk = np.asarray(chunk, dtype=np.float64)
+    if chunk.ndim == 2 and chunk.shape[1] >= 2:
+        return chunk[:, :-1], chunk[:, -1]
+    y_val: np.ndarray = chunk.ravel()
+    return np.arange(start, start + y_val.size, dtype=np.float64)[:, np.newaxis], y_val
+
+
+class MiniBatchRegression():
+
+    def __init__(
+            self,
+            learning_rate: float = 0.1,
+            batch_size: int = 256,
+            epochs: int = 10,
+            intercept: bool = False,
+            standardize: bool = True,
+            seed: str | int | None = None
+            ) -> None:
+        """Linear regression with any number of features and an optional
+        intercept, trained by mini-batch gradient descent on a stream of chunks.
+
+        Only one chunk is held in memory, its rows are shuffled and split
+        into batches. Data without feature columns uses the indices as x
+        values like LinearRegression.
+
+        Args:
+            learning_rate (float, optional):
+                Step size of the gradient descent. Defaults to 0.1.
+
+            batch_size (int, optional):
+                Rows per gradient step. Defaults to 256.
+
+            epochs (int, optional):
+                Passes over the data. Defaults to 10.
+
+            intercept (bool, optional):
+                Fit y = X * w + b instead of y = X * w. Without it the
+                line goes through the origin like LinearRegression.
+                Defaults to False.
+
+            standardize (bool, optional):
+                Scale the features with an extra pass before training,
+                without it large x values like indices diverge.
+                Defaults to True.
+
+            seed (str | int | None, optional):
+                random seed of the shuffling. Defaults to None.
+        """
+        if learning_rate <= 0:
+            raise ValueError('Learning rate must be positive.')
+        if batch_size <= 0:
+            raise ValueError('Batch size must be positive.')
+        self._learning_rate: float = learning_rate
+        self._batch_size: int = batch_size
+        self._epochs: int = epochs
+        self._intercept: bool = intercept
+        self._standardize: bool = standardize
+        self._rng: np.random.Generator = np.random.default_rng(seed_to_int(seed) if isinstance(seed, str) else seed)
+
+        # Weights and bias apply to the scaled features (x - mean) / scale
+        self._weights: np.ndarray | None = None
+        self._bias: float = 0.0
+        self._mean: np.ndarray | None = None
+        self._scale: np.ndarray | None = None
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Weights of the unscaled features.
+
+        Returns:
+            np.ndarray: weight per feature.
+        """
+        if self._weights is None:
+            raise ValueError('Model is not fitted.')
+        return self._weights / self._scale
+
+    @property
+    def intercept(self) -> float:
+        """Intercept for the unscaled features.
+
+        Returns:
+            float: y value at x = 0.
+        """
+        return float(self._bias - self._mean @ self.weights)
+
+    def scale_from_chunks(self, chunks: Iterable[np.ndarray], start: int = 0) -> None:
+        """Calculate the feature scaling in one pass over the chunks.
+
+        Without intercept the features are only scaled, not centered,
+        since centering would add an intercept.
+
+        Args:
+            chunks (Iterable[np.ndarray]): Chunks of data, see split_features.
+            start (int, optional): x value of the first y value. Defaults to 0.
+
+        Returns:
+            None
+        """
+        count: int = 0
+        sums: np.ndarray | float = 0.0
+        squares: np.ndarray | float = 0.0
+        for chunk in chunks:
+            x_val, _ = split_features(chunk, start + count)
+            count += x_val.shape[0]
+            sums = sums + x_val.sum(axis=0)
+            squares = squares + np.einsum('ij,ij->j', x_val, x_val)
+        if count == 0:
+            raise ValueError('Data must not be empty.')
+        mean: np.ndarray = np.asarray(sums) / count
+        if self._intercept:
+            scale: np.ndarray = np.sqrt(np.maximum(0.0, np.asarray(squares) / count - mean * mean))
+        else:
+            scale = np.sqrt(np.asarray(squares) / count)
+            mean = np.zeros_like(mean)
+        self._mean = mean
+        self._scale = np.where(scale > 0, scale, 1.0)
+
+    def partial_fit(self, x_val: np.ndarray, y_val: np.ndarray) -> float:
+        """One gradient descent step on a batch.
+
+        Args:
+            x_val (np.ndarray): features with shape (n, features).
+            y_val (np.ndarray): y values.
+
+        Returns:
+            float: mean squared error of the batch before the step.
+        """
+        if self._weights is None:
+            self._weights = np.zeros(x_val.shape[1])
+            if self._mean is None:
+                self._mean = np.zeros(x_val.shape[1])
+                self._scale = np.ones(x_val.shape[1])
+        scaled: np.ndarray = (x_val - self._mean) / self._scale
+        residuals: np.ndarray = scaled @ self._weights + self._bias - y_val
+        self._weights -= self._learning_rate * (residuals @ scaled) / y_val.size
+        if self._intercept:
+            self._bias -= self._learning_rate * residuals.mean()
+        return float(residuals @ residuals) / y_val.size
+
+    def fit_chunks(self, chunks: Callable[[], Iterable[np.ndarray]], start: int = 0) -> tuple[np.ndarray, float, float]:
+        """Train on a stream of chunks, which is opened once per pass.
+
+        Args:
+            chunks (Callable[[], Iterable[np.ndarray]]):
+                Function returning a fresh iterable of chunks, see split_features.
+
+            start (int, optional):
+                x value of the first y value. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, float, float]:
+                Weights, intercept, mean squared error of the last epoch
+        """
+        if self._standardize and self._weights is None:
+            self.scale_from_chunks(chunks(), start)
+        loss: float = 0.0
+        for epoch in range(self._epochs):
+            count: int = 0
+            loss_sum: float = 0.0
+            for chunk in chunks():
+                x_val, y_val = split_features(chunk, start + count)
+                count += y_val.size
+                order: np.ndarray = self._rng.permutation(y_val.size)
+                for begin in range(0, y_val.size, self._batch_size):
+                    batch: np.ndarray = order[begin:begin + self._batch_size]
+                    loss_sum += self.partial_fit(x_val[batch], y_val[batch]) * batch.size
+            loss = loss_sum / max(count, 1)
+            logger.info('Epoch: %s | Loss: %s', epoch, loss)
+        return (self.weights, self.intercept, loss)
+
+    def fit(self, data: list[float | int] | np.ndarray, features: np.ndarray | None = None) -> tuple[np.ndarray, float, float]:
+        """Train on data in memory.
+
+        Args:
+            data (list[float | int] | np.ndarray):
+                y values.
+
+            features (np.ndarray | None, optional):
+                Features with shape (n, features) or (n,).
+                If None, indicies will be x values. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, float, float]:
+                Weights, intercept, mean squared error of the last epoch
+        """
+        y_val: np.ndarray = np.asarray(data, dtype=np.float64)
+        if features is None:
+            table: np.ndarray = y_val
+        else:
+            table = np.column_stack((np.asarray(features, dtype=np.float64).reshape(y_val.size, -1), y_val))
+        return self.fit_chunks(lambda: [table])
+
+    def fit_files(
+            self,
+            paths: Iterable[str],
+            chunk_size: int = 1_000_000,
+            skip_header: int = 0
+            ) -> tuple[np.ndarray, float, float]:
+        """Train on files without loading them, the files are read once per pass.
+
+        Files with one column continue each others indices.
+
+        Args:
+            paths (Iterable[str]): Paths to .npy or CSV files, see iter_file_chunks.
+            chunk_size (int, optional): Rows per chunk. Defaults to 1_000_000.
+            skip_header (int, optional): Lines to skip at the start of a CSV file. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, float, float]:
+                Weights, intercept, mean squared error of the last epoch
+        """
+        paths = list(paths)
+        return self.fit_chunks(lambda: itertools.chain.from_iterable(
+            iter_file_chunks(path, chunk_size, skip_header) for path in paths))
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predict y values.
+
+        Args:
+            features (np.ndarray): Features with shape (n, features) or (n,).
+
+        Returns:
+            np.ndarray: predicted y values.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        return features.reshape(features.shape[0], -1) @ self.weights + self.intercept
 
 
 class TestLinearRegression:
@@ -256,6 +1220,61 @@ class TestLinearRegression:
         linreg: LinearRegression = LinearRegression(self.data)
         assert round(linreg.calc_current_error(1.0), 2) == 0.0
 
+    def test_calc_current_error_matches_loop(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng)
+        expected: float = sum((y - x * 1.3)**2 for x, y in enumerate(self.data_rng))
+        assert round(linreg.calc_current_error(1.3), 6) == round(expected, 6)
+
+    def test_solve(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng)
+        slope, error, iters = linreg.solve()
+        assert iters == 1
+        assert error <= linreg.calc_current_error(slope + 1e-6)
+        assert error <= linreg.calc_current_error(slope - 1e-6)
+        assert LinearRegression(self.data).solve()[:2] == (1.0, 0.0)
+
+    def test_stats_from_chunks(self) -> None:
+        whole: SufficientStats = SufficientStats.from_data(self.data_rng)
+        chunks: list[np.ndarray] = np.array_split(np.array(self.data_rng), 7)
+        assert stats_from_chunks(chunks) == whole
+        assert merge_stats([SufficientStats.from_data(chunk) for chunk in chunks]) == whole
+
+    def test_fit_files(self, tmp_path) -> None:
+        half: int = len(self.data_rng) // 2
+        np.save(tmp_path / 'first.npy', np.array(self.data_rng[:half]))
+        np.savetxt(tmp_path / 'second.csv', np.array(self.data_rng[half:]), delimiter=',')
+        slope, error, n_points = fit_files([str(tmp_path / 'first.npy'), str(tmp_path / 'second.csv')], chunk_size=16)
+        expected_slope, expected_error, _ = LinearRegression(self.data_rng).solve()
+        assert (round(slope, 10), round(error, 6), n_points) == (round(expected_slope, 10), round(expected_error, 6), 100)
+
+    def test_fit_files_xy(self, tmp_path) -> None:
+        x_val: np.ndarray = np.arange(100, dtype=np.float64)
+        table: np.ndarray = np.column_stack((x_val, 2 * x_val + 1))
+        np.savetxt(tmp_path / 'first.csv', table[:50], delimiter=',')
+        np.savetxt(tmp_path / 'second.csv', table[50:], delimiter=',')
+        paths: list[str] = [str(tmp_path / 'first.csv'), str(tmp_path / 'second.csv')]
+        expected: float = SufficientStats.from_xy(x_val, table[:, 1]).solve()
+        assert round(fit_files(paths, chunk_size=16)[0], 10) == round(expected, 10)
+        assert round(fit_files(paths, chunk_size=16, consecutive=False)[0], 10) == round(expected, 10)
+
+    def test_fit_batch(self) -> None:
+        series: np.ndarray = np.array([self.data_rng, [2 * y for y in self.data_rng], [y + y % 7 for y in self.data]])
+        slopes, errors, iters = fit_batch(series, 'halving')
+        for index, row in enumerate(series):
+            expected: tuple[float, float, int] = LinearRegression(list(row)).recursive_approx()
+            assert (round(slopes[index], 8), round(errors[index], 4), iters[index]) == (
+                round(expected[0], 8), round(expected[1], 4), expected[2])
+        slopes, errors, iters = fit_batch(series)
+        assert round(slopes[0], 8) == round(LinearRegression(self.data_rng).solve()[0], 8)
+        assert list(iters) == [1, 1, 1]
+
+    def test_bootstrap(self) -> None:
+        data: np.ndarray = generate_random_data('test', 200, 0, 200, lambda x: 1.5 * x, noise=20)
+        slope, lower, upper = LinearRegression(data).bootstrap(500, seed='test')
+        assert lower < slope < upper and lower < 1.5 < upper
+        assert bootstrap_slope(data, 500, seed='test', block_size=64, max_workers=2) == bootstrap_slope(
+            data, 500, seed='test', block_size=64)
+
     def test_calc_next_stepw(self) -> None:
         linreg: LinearRegression = LinearRegression(self.data)
         assert linreg.calc_next_stepw(1.0, -1.0) == -0.5
@@ -269,24 +1288,95 @@ class TestLinearRegression:
         slope, error, iters = linreg.recursive_approx()
         assert (round(slope, 2), round(error, 2), round(iters, 2)) == (1.02, 91.51, 19)
 
+    def test_recursive_approx_strategies(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng)
+        optimum: float = linreg.solve()[0]
+        for strategy in ('golden', 'newton'):
+            slope, error, iters = LinearRegression(self.data_rng).recursive_approx(strategy=strategy)
+            assert round(slope, 6) == round(optimum, 6)
+            assert round(error, 4) == round(linreg.calc_current_error(optimum), 4)
+        assert LinearRegression(self.data_rng).recursive_approx(strategy='newton')[2] == 2
+
+    def test_recursive_approx_max_iterations(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng)
+        assert linreg.recursive_approx(strategy='golden', max_iterations=3, tolerance=0.0)[2] == 3
+
+    def test_headless(self) -> None:
+        progress: list[tuple[int, float, float]] = []
+        linreg: LinearRegression = LinearRegression(self.data_rng, headless=True, progress=lambda *args: progress.append(args))
+        slope, error, iters = linreg.recursive_approx(stepping=1)
+        assert linreg._plot is None
+        assert len(progress) == iters
+        assert progress[-1] == (iters - 1, slope, error)
+
+    def test_slope_errors_buffer(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng)
+        for index in range(100):
+            linreg.append_slope_error(index, 2 * index)
+        assert linreg.slope_errors.shape == (100, 2)
+        assert list(linreg.slope_errors[99]) == [99.0, 198.0]
+        linreg.clear_slope_errors()
+        assert linreg.slope_errors.shape == (0, 2)
+
+    def test_render_diagram_incremental(self) -> None:
+        linreg: LinearRegression = LinearRegression(self.data_rng, headless=True)
+        linreg.recursive_approx()
+        linreg.render_diagram(1.0)
+        regression = linreg._artists['regression']
+        linreg.render_diagram(1.01)
+        assert linreg._artists['regression'] is regression
+        assert regression.get_ydata()[10] == 10 * 1.01
+
     def test_render_diagram(self) -> None:
         linreg: LinearRegression = LinearRegression(self.data_rng)
         render = linreg.render_diagram(2.0)
         assert render is None
 
 
+class TestMiniBatchRegression:
+
+    features: np.ndarray = np.random.default_rng(0).uniform(-50, 50, size=(1000, 2))
+    targets: np.ndarray = features @ np.array([2.0, -0.5]) + 5.0
+
+    def test_fit_uniform(self) -> None:
+        data: list[float | int] = TestLinearRegression.data_rng
+        weights, intercept, _ = MiniBatchRegression(batch_size=16, epochs=50, seed='test').fit(data)
+        assert intercept == 0.0
+        assert round(weights[0], 2) == round(LinearRegression(data).solve()[0], 2)
+
+    def test_fit_features(self) -> None:
+        weights, intercept, loss = MiniBatchRegression(
+            batch_size=32, epochs=30, intercept=True, seed='test').fit(self.targets, self.features)
+        assert np.allclose(weights, [2.0, -0.5]) and round(intercept, 6) == 5.0 and loss < 1e-6
+
+    def test_fit_files(self, tmp_path) -> None:
+        np.save(tmp_path / 'table.npy', np.column_stack((self.features, self.targets)))
+        model: MiniBatchRegression = MiniBatchRegression(batch_size=32, epochs=30, intercept=True, seed='test')
+        model.fit_files([str(tmp_path / 'table.npy')], chunk_size=100)
+        assert np.allclose(model.predict(self.features[:5]), self.targets[:5])
+
+
 def generate_random_data(
-        seed: str | None = None,
+        seed: str | int | None = None,
         n_datapoints: int = 100,
         lower_bound: int = 0,
         upper_bound: int = 100,
-        function: Callable | None = None,
-        noise: int = 0
-        ) -> list:
+        function: Callable[[np.ndarray], np.ndarray] | None = None,
+        noise: float = 0,
+        noise_distribution: str = 'uniform',
+        out: str | None = None,
+        chunk_size: int = 1_000_000,
+        legacy: bool = False
+        ) -> np.ndarray:
     """Random data generator for linear regression method
 
+    The data is drawn by a numpy generator, so a seed gives other data than
+    with random.Random before, and a function is evaluated at n_datapoints
+    evenly spaced x values instead of at every integer of the range.
+    Use legacy=True to get the data of old seeds again.
+
     Args:
-        seed (str | None, optional):
+        seed (str | int | None, optional):
             random seed, to produce same data. Defaults to None.
         n_datapoints (int, optional):
             Amount of points for random cloud. Defaults to 100.
@@ -294,21 +1384,122 @@ def generate_random_data(
             Lowest number of range. Defaults to 0.
         upper_bound (int, optional):
             Highest number of range. Defaults to 100.
-        function (Callable | None, optional):
-            function for data generator.
+        function (Callable[[np.ndarray], np.ndarray] | None, optional):
+            vectorized function for data generator, evaluated at
+            n_datapoints evenly spaced x values of the range.
             If None, data will have a random shape.
             Defaults to None.
-        noise (int, optional):
-            Random standard deviation around datapoints. Defaults to 0.
+        noise (float, optional):
+            Random spread around datapoints. Defaults to 0.
+        noise_distribution (str, optional):
+            'uniform' for noise * U(-0.5, 0.5) or 'normal' for
+            noise as standard deviation. Defaults to 'uniform'.
+        out (str | None, optional):
+            Path of a .npy file to write the data to, chunk by chunk.
+            The returned array is memory-mapped. Defaults to None.
+        chunk_size (int, optional):
+            Points generated at once. Defaults to 1_000_000.
+        legacy (bool, optional):
+            Draw with random.Random like the list based version, so old
+            seeds give the same data. A function is evaluated at every
+            integer of the range and n_datapoints is ignored, the noise is
+            uniform and the data is always held in memory. Defaults to False.
 
     Returns:
-        list: data with random y values.
+        np.ndarray: data with random y values.
     """
-    rng = random.Random(seed)
-    if function is not None:
-        return [function(x) + (function(x) * 0 + noise * (rng.random() - 0.5)) for x in range(lower_bound, upper_bound)]
+    if noise_distribution not in ('uniform', 'normal'):
+        raise ValueError(f'Unknown noise distribution {noise_distribution}, use uniform or normal.')
+    if chunk_size <= 0:
+        raise ValueError('Chunk size must be positive.')
+    if legacy:
+        legacy_rng: random.Random = random.Random(seed)
+        if function is not None:
+            values: list = [function(x) + noise * (legacy_rng.random() - 0.5) for x in range(lower_bound, upper_bound)]
+        else:
+            values = legacy_rng.sample(range(lower_bound, upper_bound), n_datapoints)
+        n_datapoints = len(values)
+    rng: np.random.Generator = np.random.default_rng(seed_to_int(seed) if isinstance(seed, str) else seed)
+    data: np.ndarray = np.empty(n_datapoints) if out is None else np.lib.format.open_memmap(out, 'w+', np.float64, (n_datapoints,))
+
+    if legacy:
+        data[:] = values
+    elif function is None:
+        sample_range(rng, data, lower_bound, upper_bound, chunk_size)
     else:
-        return rng.sample(range(lower_bound, upper_bound), n_datapoints)
+        width: float = (upper_bound - lower_bound) / n_datapoints
+        for begin in range(0, n_datapoints, chunk_size):
+            end: int = min(begin + chunk_size, n_datapoints)
+            x_val: np.ndarray = lower_bound + width * np.arange(begin, end, dtype=np.float64)
+            if noise_distribution == 'uniform':
+                spread: np.ndarray = noise * (rng.random(end - begin) - 0.5)
+            else:
+                spread = noise * rng.standard_normal(end - begin)
+            data[begin:end] = function(x_val) + spread
+
+    if out is not None:
+        data.flush()
+    return data
+
+
+def sample_range(rng: np.random.Generator, data: np.ndarray, lower_bound: int, upper_bound: int, chunk_size: int) -> None:
+    """Fill data with distinct random integers of a range, chunk by chunk.
+
+    The range is split into blocks of about chunk_size draws each. The number
+    of draws per block follows the hypergeometric distribution, so the union
+    is a uniform sample without replacement, which is shuffled in place at the
+    end. Besides data, memory stays in the order of chunk_size.
+    Ranges of 1e9 integers and more exceed the hypergeometric sampler of numpy
+    and are drawn at once.
+
+    Args:
+        rng (np.random.Generator): random generator.
+        data (np.ndarray): array to fill, e.g. memory-mapped.
+        lower_bound (int): lowest number of the range.
+        upper_bound (int): highest number of the range, exclusive.
+        chunk_size (int): draws per block.
+
+    Raises:
+        ValueError: if the range holds fewer integers than data.
+    """
+    population: int = upper_bound - lower_bound
+    n_datapoints: int = data.shape[0]
+    if n_datapoints > population:
+        raise ValueError('Sample is larger than the range.')
+    if n_datapoints == 0 or population >= 10**9:
+        data[:] = rng.choice(population, n_datapoints, replace=False) + lower_bound
+        return
+
+    block: int = -(-population * chunk_size // n_datapoints)
+    filled: int = 0
+    for begin in range(0, population, block):
+        size: int = min(block, population - begin)
+        rest: int = population - begin - size
+        count: int = int(rng.hypergeometric(size, rest, n_datapoints - filled)) if rest else n_datapoints - filled
+        if 4 * count >= size:
+            drawn: np.ndarray = rng.permutation(size)[:count]
+        else:
+            # Draws with replacement topped up to count distinct values are a uniform subset by symmetry
+            drawn = np.empty(0, dtype=np.int64)
+            while drawn.size < count:
+                drawn = np.sort(np.concatenate((drawn, rng.integers(size, size=count - drawn.size))))
+                drawn = drawn[np.concatenate(([True], drawn[1:] != drawn[:-1]))]
+        data[filled:filled + count] = drawn + lower_bound + begin
+        filled += count
+    # Subclasses like np.memmap are shuffled item by item, the plain view of the same buffer at once
+    rng.shuffle(data.view(np.ndarray))
+
+
+def seed_to_int(seed: str) -> int:
+    """Turn a text seed into an integer seed, stable across runs unlike hash().
+
+    Args:
+        seed (str): text seed.
+
+    Returns:
+        int: integer seed.
+    """
+    return int.from_bytes(hashlib.sha256(seed.encode()).digest(), 'little')
 
 
 def test_generate_random_data() -> None:
@@ -316,8 +1507,30 @@ def test_generate_random_data() -> None:
     assert [round(a, 2), round(b, 2), round(c, 2), round(d, 2)] == [-10.0, -5.0, 0.0, 5.0]
 
 
+def test_generate_random_data_seeded(tmp_path) -> None:
+    data: np.ndarray = generate_random_data('test', 1000, 0, 1000, lambda x: 2 * x, noise=5, noise_distribution='normal')
+    chunked: np.ndarray = generate_random_data(
+        'test', 1000, 0, 1000, lambda x: 2 * x, noise=5, noise_distribution='normal', out=str(tmp_path / 'data.npy'), chunk_size=64)
+    assert np.array_equal(data, chunked)
+    assert np.array_equal(np.load(tmp_path / 'data.npy'), data)
+    sample: np.ndarray = generate_random_data('test', 50, 0, 100)
+    assert np.unique(sample).size == 50 and sample.min() >= 0 and sample.max() < 100
+    sample = generate_random_data('test', 1000, -500, 2000, out=str(tmp_path / 'sample.npy'), chunk_size=64)
+    assert np.unique(sample).size == 1000 and sample.min() >= -500 and sample.max() < 2000
+    assert not np.array_equal(sample, np.sort(sample))
+
+
+def test_generate_random_data_legacy() -> None:
+    rng: random.Random = random.Random('test')
+    expected: list = [2 * x + 5 * (rng.random() - 0.5) for x in range(-10, 10)]
+    assert generate_random_data('test', 4, -10, 10, lambda x: 2 * x, noise=5, legacy=True).tolist() == expected
+    rng = random.Random('test')
+    assert generate_random_data('test', 5, 0, 100, legacy=True).tolist() == rng.sample(range(0, 100), 5)
+
+
 if __name__ == "__main__":
-    random_sample = generate_random_data(n_datapoints=250, upper_bound=500, function=lambda x: 1 * x, noise=50)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    random_sample = generate_random_data(n_datapoints=500, upper_bound=500, function=lambda x: 1 * x, noise=50)
     linreg = LinearRegression(random_sample)
     linreg.recursive_approx(stepping=1)
     input('Press any key to end program.')
@@ -0,0 +1,383 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from model import POLICIES, Roboid
+from presenter import Presenter
+from view import Environment
+
+# The shared benchmark helpers live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_tools import measure, run_cli  # noqa: E402
+
+HIGHER_IS_BETTER = ('steps_per_sec', 'calls_per_sec')
+
+
+def setup_case(mapsize: int, density: float, seed: int) -> tuple[Roboid, Environment, Presenter]:
+    """Create a seeded model, view and presenter on a blob map.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map, 0 creates an open map
+        seed (int): seed for the map, start and target
+
+    Returns:
+        tuple[Roboid, Environment, Presenter]: model, view and presenter
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    mapshape = (mapsize, mapsize)
+    view = Environment(mapshape)
+    view.map = view.create_blob_map(seed, density=density)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = Roboid(mapshape)
+        presenter = Presenter(model, view)
+    return model, view, presenter
+
+
+def calc_f_rel(model: Roboid) -> float:
+    """Exploit a copy of the learned maps and calculate f_rel like the presenter does.
+
+    Args:
+        model (Roboid): model with a learned exploit map
+
+    Returns:
+        float: f_rel of the exploitation
+    """
+    exploit_map = model.exploit_map.copy()
+    model.exploit()
+    model.exploit_map = exploit_map
+    optimal = model.calc_manhattan_distance() + 1
+    return abs(model.steps - optimal) / optimal
+
+
+def bench_explore_once(mapsize: int, density: float, seed: int, episodes: int) -> dict[str, float]:
+    """Benchmark single explorations.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        episodes (int): number of explorations
+
+    Returns:
+        dict[str, float]: wall time, steps per second and peak memory
+    """
+    model, _, presenter = setup_case(mapsize, density, seed)
+
+    def run() -> float:
+        random.seed(seed)
+        model.wipe_maps()
+        steps = 0
+        for _ in range(episodes):
+            model.explore_once(presenter.adjacent_pos)
+            steps += model.steps
+        return steps
+
+    steps, seconds, peak = measure(run)
+    return {'seconds': seconds, 'steps_per_sec': steps / seconds, 'peak_bytes': peak}
+
+
+def bench_explore(mapsize: int, density: float, seed: int, episodes: int) -> dict[str, float]:
+    """Benchmark a full exploration run.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        episodes (int): number of explorations
+
+    Returns:
+        dict[str, float]: wall time, explorations and peak memory
+    """
+    model, _, presenter = setup_case(mapsize, density, seed)
+
+    def run() -> float:
+        random.seed(seed)
+        model.wipe_maps()
+        model.explore(presenter.adjacent_pos, episodes)
+        return model.num_explorations
+
+    explorations, seconds, peak = measure(run)
+    return {'seconds': seconds, 'explorations': explorations, 'peak_bytes': peak}
+
+
+def bench_exploit(mapsize: int, density: float, seed: int, episodes: int) -> dict[str, float]:
+    """Benchmark the exploitation of a learned exploit map.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        episodes (int): number of explorations
+
+    Returns:
+        dict[str, float]: wall time, steps per second and peak memory
+    """
+    model, _, presenter = setup_case(mapsize, density, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.explore(presenter.adjacent_pos, episodes)
+    exploit_map = model.exploit_map.copy()
+
+    def run() -> float:
+        model.exploit_map = exploit_map.copy()
+        model.exploit()
+        return model.steps
+
+    steps, seconds, peak = measure(run)
+    return {'seconds': seconds, 'steps_per_sec': steps / seconds, 'peak_bytes': peak}
+
+
+def bench_exploit_batch(mapsize: int, density: float, seed: int, calls: int) -> dict[str, float]:
+    """Benchmark compiling the diffused exploit map and walking it from every free tile.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        calls (int): number of calls
+
+    Returns:
+        dict[str, float]: wall time, steps per second and peak memory
+    """
+    model, view, _ = setup_case(mapsize, density, seed)
+    model.calc_diffusion_map(view.map >= 0)
+    starts = [tuple(pos) for pos in np.argwhere(view.map >= 0)]
+
+    def run() -> float:
+        steps = 0
+        for _ in range(calls):
+            model.compile_exploit_map()
+            steps += model.exploit_batch(starts)[0].sum()
+        return steps
+
+    steps, seconds, peak = measure(run)
+    return {'seconds': seconds, 'steps_per_sec': steps / seconds, 'peak_bytes': peak}
+
+
+def bench_calc_exploit_map(mapsize: int, density: float, seed: int, calls: int) -> dict[str, float]:
+    """Benchmark the calculation of the exploit map.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        calls (int): number of calls
+
+    Returns:
+        dict[str, float]: wall time, calls per second and peak memory
+    """
+    model, _, presenter = setup_case(mapsize, density, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.explore_once(presenter.adjacent_pos)
+
+    def run() -> float:
+        for _ in range(calls):
+            model.wipe_exploit_map()
+            model.calc_exploit_map()
+        return calls
+
+    calls, seconds, peak = measure(run)
+    return {'seconds': seconds, 'calls_per_sec': calls / seconds, 'peak_bytes': peak}
+
+
+def bench_calc_diffusion_map(mapsize: int, density: float, seed: int, calls: int) -> dict[str, float]:
+    """Benchmark the diffusion of the exploit map over the whole map.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        calls (int): number of calls
+
+    Returns:
+        dict[str, float]: wall time, calls per second and peak memory
+    """
+    model, view, _ = setup_case(mapsize, density, seed)
+    walkable = view.map >= 0
+
+    def run() -> float:
+        for _ in range(calls):
+            model.calc_diffusion_map(walkable)
+        return calls
+
+    calls, seconds, peak = measure(run)
+    return {'seconds': seconds, 'calls_per_sec': calls / seconds, 'peak_bytes': peak}
+
+
+def bench_load_map_from_image(mapsize: int, density: float, seed: int, calls: int) -> dict[str, float]:
+    """Benchmark loading a map from an image.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        calls (int): number of calls
+
+    Returns:
+        dict[str, float]: wall time, calls per second and peak memory
+    """
+    _, view, _ = setup_case(mapsize, density, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        image_path = os.path.join(directory, 'map.png')
+        view.save_map_to_image(image_path)
+
+        def run() -> float:
+            for _ in range(calls):
+                view.load_map_from_image(image_path)
+            return calls
+
+        calls, seconds, peak = measure(run)
+    return {'seconds': seconds, 'calls_per_sec': calls / seconds, 'peak_bytes': peak}
+
+
+def bench_episodes_to_target(
+        mapsize: int,
+        density: float,
+        seed: int,
+        policy: str,
+        target_f_rel: float,
+        max_episodes: int
+        ) -> dict[str, float]:
+    """Count the explorations needed until the exploitation reaches the target f_rel.
+
+    Args:
+        mapsize (int): side length of the square map
+        density (float): obstacle density of the map
+        seed (int): seed for the map, start, target and walks
+        policy (str): name of the exploration policy with its default parameters
+        target_f_rel (float): f_rel to reach
+        max_episodes (int): max number of explorations
+
+    Returns:
+        dict[str, float]: wall time, explorations and last f_rel
+    """
+    model, _, presenter = setup_case(mapsize, density, seed)
+    model.policy = POLICIES[policy]()
+    random.seed(seed)
+    episodes = 0
+    f_rel = float('inf')
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while episodes < max_episodes and f_rel > target_f_rel:
+            model.policy.anneal(episodes)
+            model.explore_once(presenter.adjacent_pos)
+            episodes += 1
+            f_rel = calc_f_rel(model)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'episodes': episodes, 'f_rel': f_rel}
+
+
+def import_time_report(module: str = 'main', top: int = 10) -> tuple[float, list[tuple[str, float]]]:
+    """Import a module in a fresh interpreter with -X importtime and summarize the report.
+
+    Args:
+        module (str, optional): module to import. Defaults to 'main'.
+        top (int, optional): number of slowest direct imports to list. Defaults to 10.
+
+    Returns:
+        tuple[float, list[tuple[str, float]]]: total seconds, slowest direct imports of the module with seconds
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True)
+
+    # Lines look like 'import time: self [us] | cumulative | imported package', each nesting level
+    # indents by two spaces and children are listed before their parent
+    total = 0.0
+    children = {}
+    pending = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending[name.strip()] = int(cumulative) / 1e6
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative) / 1e6
+                children = pending
+            pending = {}
+    slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total, slowest
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run all benchmarks for every map size and wall density.
+
+    Args:
+        args (argparse.Namespace): arguments
+
+    Returns:
+        dict[str, dict[str, float]]: metrics per benchmark case
+    """
+    results = {}
+    total, slowest = import_time_report()
+    results['import_time/main'] = {'seconds': total}
+    print(f'Importing main takes {total * 1000:.1f} ms, slowest imports:')
+    for name, seconds in slowest:
+        print(f'  {name:<30} {seconds * 1000:8.1f} ms')
+
+    for mapsize in args.sizes:
+        for density in args.densities:
+            case = f'{mapsize}x{mapsize}/d{density:.2f}'
+            print(f'Running {case}...')
+            results[f'explore_once/{case}'] = bench_explore_once(mapsize, density, args.seed, args.episodes)
+            results[f'explore/{case}'] = bench_explore(mapsize, density, args.seed, args.episodes)
+            results[f'exploit/{case}'] = bench_exploit(mapsize, density, args.seed, args.episodes)
+            results[f'exploit_batch/{case}'] = bench_exploit_batch(mapsize, density, args.seed, args.calls)
+            results[f'calc_exploit_map/{case}'] = bench_calc_exploit_map(mapsize, density, args.seed, args.calls)
+            results[f'calc_diffusion_map/{case}'] = bench_calc_diffusion_map(mapsize, density, args.seed, args.calls)
+            results[f'load_map_from_image/{case}'] = bench_load_map_from_image(mapsize, density, args.seed, args.calls)
+            for policy in args.policies:
+                results[f'episodes_to_target/{policy}/{case}'] = bench_episodes_to_target(
+                    mapsize, density, args.seed, policy, args.target_f_rel, args.max_episodes)
+    return results
+
+
+def sanity_check_args(args: argparse.Namespace) -> None:
+    """Sanity check the arguments.
+
+    Args:
+        args (argparse.Namespace): arguments
+
+    Raises:
+        ValueError: if the arguments are invalid
+    """
+    if any(size < 4 for size in args.sizes):
+        raise ValueError("Map sizes must be at least 4")
+    if any(not 0 <= density < 1 for density in args.densities):
+        raise ValueError("Densities must be in [0, 1)")
+    if args.episodes <= 0 or args.calls <= 0 or args.max_episodes <= 0:
+        raise ValueError("Episodes and calls must be greater than 0")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the reinforcement learning package.')
+    parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[20, 40], help='Map side lengths')
+    parser.add_argument('-d', '--densities', type=float, nargs='+', default=[0.0, 0.2], help='Obstacle densities')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for maps, start, target and walks')
+    parser.add_argument('-e', '--episodes', type=int, default=5, help='Explorations per benchmark')
+    parser.add_argument('-c', '--calls', type=int, default=100, help='Calls for the map benchmarks')
+    parser.add_argument('-f', '--target-f-rel', type=float, default=0.1, help='Target f_rel for episodes to target')
+    parser.add_argument('-p', '--policies', type=str, nargs='+', choices=tuple(POLICIES), default=list(POLICIES),
+                        help='Exploration policies for episodes to target')
+    parser.add_argument('--max-episodes', type=int, default=200, help='Max explorations for episodes to target')
+    run_cli(parser, run_benchmarks, sanity_check_args, HIGHER_IS_BETTER)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import argparse
 
-from model import Roboid
+from model import POLICIES, EpsilonGreedyPolicy, Roboid, SoftmaxPolicy, TrajectoryRecorder, UniformPolicy
 from presenter import Presenter
 from view import Environment
 
@@ -36,6 +36,32 @@ def sanity_check_args(args: argparse.Namespace) -> None:
     if args.explorations <= 0:
         raise ValueError("Number of explorations must be greater than 0")
 
+    # Check the exploration policy
+    if not 0 <= args.epsilon <= 1:
+        raise ValueError("Epsilon must be between 0 and 1")
+    if args.temperature <= 0:
+        raise ValueError("Temperature must be greater than 0")
+    if not 0 < args.decay <= 1:
+        raise ValueError("Decay must be greater than 0 and at most 1")
+
+
+def create_policy(args: argparse.Namespace) -> UniformPolicy | EpsilonGreedyPolicy | SoftmaxPolicy:
+    """Create the exploration policy from the arguments.
+
+    Args:
+        args (argparse.Namespace): arguments
+
+    Returns:
+        UniformPolicy | EpsilonGreedyPolicy | SoftmaxPolicy: exploration policy
+    """
+    match args.policy:
+        case 'epsilon':
+            return EpsilonGreedyPolicy(args.epsilon, args.decay, min(0.01, args.epsilon))
+        case 'softmax':
+            return SoftmaxPolicy(args.temperature, args.decay, min(0.01, args.temperature))
+        case _:
+            return UniformPolicy()
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -45,6 +71,12 @@ def main():
     parser.add_argument('-e', '--explorations', type=int, default=20)
     parser.add_argument('-r', '--repeat', type=int, default=1)
     parser.add_argument('-i', '--intermediate', action='store_true', default=False)
+    parser.add_argument('-d', '--diffusion', action='store_true', default=False, help='Build the exploit map by diffusion')
+    parser.add_argument('-p', '--policy', type=str, choices=tuple(POLICIES), default='uniform', help='Exploration policy')
+    parser.add_argument('--epsilon', type=float, default=0.3, help='Initial epsilon of the epsilon-greedy policy')
+    parser.add_argument('--temperature', type=float, default=0.1, help='Initial temperature of the softmax policy')
+    parser.add_argument('--decay', type=float, default=0.9, help='Decay of epsilon or temperature per exploration')
+    parser.add_argument('--record', type=str, default=None, help='Append the exploration paths to this trajectory file')
     args = parser.parse_args()
 
     # Sanity check the arguments
@@ -57,11 +89,28 @@ def main():
 
     # Create model, view and presenter
     model = Roboid(mapshape, pos_start, pos_target)
+    model.policy = create_policy(args)
     view = Environment(mapshape)
     presenter = Presenter(model, view)
 
     # Run the application
-    presenter.run(args.explorations, args.repeat, args.intermediate)
+    if args.record is None:
+        presenter.run(args.explorations, args.repeat, args.intermediate, args.diffusion)
+    else:
+        with TrajectoryRecorder(args.record, mapshape) as recorder:
+            model.recorder = recorder
+            presenter.run(args.explorations, args.repeat, args.intermediate, args.diffusion)
+
+
+def test_create_policy() -> None:
+    args = argparse.Namespace(policy='epsilon', epsilon=0.3, temperature=0.1, decay=0.8)
+    policy = create_policy(args)
+    assert isinstance(policy, POLICIES['epsilon']) and policy.epsilon == 0.3 and policy.decay == 0.8
+    args.policy = 'softmax'
+    policy = create_policy(args)
+    assert isinstance(policy, POLICIES['softmax']) and policy.temperature == 0.1 and policy.temperature_min == 0.01
+    args.policy = 'uniform'
+    assert isinstance(create_policy(args), POLICIES['uniform'])
 
 
 if __name__ == "__main__":
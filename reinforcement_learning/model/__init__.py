@@ -1,8 +1,20 @@
+import contextlib
+import io
 import random
 from typing import Callable
 
 import numpy as np
 
+from .policy import POLICIES, EpsilonGreedyPolicy, SoftmaxPolicy, UniformPolicy
+from .successor import CYCLE, DEAD_END, compile_successor_field, walk_successor_field
+from .trajectory import TrajectoryReader, TrajectoryRecorder
+from .walker import Walker
+
+__all__ = [
+    'CYCLE', 'DEAD_END', 'POLICIES', 'EpsilonGreedyPolicy', 'Roboid', 'SoftmaxPolicy',
+    'TrajectoryReader', 'TrajectoryRecorder', 'UniformPolicy', 'Walker'
+]
+
 
 class Roboid:
 
@@ -27,6 +39,12 @@ class Roboid:
 
         self.adjacent_pos = {}
 
+        self.recorder: TrajectoryRecorder | None = None
+        self.policy: UniformPolicy | EpsilonGreedyPolicy | SoftmaxPolicy = UniformPolicy()
+
+        self.successor_map: np.ndarray | None = None
+        self.successor_flags: np.ndarray | None = None
+
     @property
     def mapshape(self) -> tuple[int, int]:
         """Get the map shape.
@@ -117,6 +135,9 @@ class Roboid:
         """
         self.check_pos_is_valid(target)
         self._target = target
+        # The compiled successors stop at the old target
+        self.successor_map = None
+        self.successor_flags = None
 
     @property
     def adjacent_pos(self) -> dict[tuple[int, int]: float]:
@@ -263,7 +284,10 @@ class Roboid:
 
     @exploit_map.setter
     def exploit_map(self, exploit_map: np.ndarray) -> None:
-        """Set the exploit map.
+        """Set the exploit map, the compiled successors of the old map are dropped.
+
+        Changes to the exploit map in place are not noticed, call
+        compile_exploit_map after them.
 
         Args:
             exploit_map (np.ndarray): exploit map
@@ -273,6 +297,8 @@ class Roboid:
         """
         self.check_map_is_valid(exploit_map)
         self._exploit_map = exploit_map
+        self.successor_map = None
+        self.successor_flags = None
 
     @property
     def walk_map(self) -> np.ndarray:
@@ -416,11 +442,70 @@ class Roboid:
         Returns:
             None
         """
+        if self.memory_map.max() <= 0:
+            # A walk without a single step has nothing to learn from
+            return
         abs_exploit_map = self.exploit_map.sum()
         new_exploit_map = self.memory_map / self.memory_map.max()
         if (0 >= abs_exploit_map) or (abs_exploit_map > new_exploit_map.sum()):
             self.exploit_map = new_exploit_map
 
+    def calc_diffusion_map(self, walkable: np.ndarray, max_distance: int | None = None) -> np.ndarray:
+        """Calculate the exploit map directly from the walkable tiles of the map.
+
+        The distance to the target is found by one breadth first search over
+        the graph of adjacent walkable tiles, which takes time linear in the
+        number of tiles however long the paths are. The exploit map is 1 on
+        the target and falls linearly with the distance, unreachable and
+        forbidden tiles are 0, so the greedy exploit walk follows a shortest path.
+
+        Args:
+            walkable (np.ndarray): boolean map, True where the roboid may move
+            max_distance (int | None, optional): Max distance to the target, farther
+                tiles count as unreachable. If None, no limit. Defaults to None.
+
+        Returns:
+            self.exploit_map (np.ndarray): exploit map
+
+        Raises:
+            ValueError: if the target is on a forbidden tile
+        """
+        # Scipy is slow to import and only needed here
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import dijkstra
+
+        self.check_map_is_valid(walkable)
+        walkable = walkable.astype(bool)
+        if not walkable[self.target]:
+            raise ValueError("Target is on a forbidden tile, no tile can reach it.")
+
+        cells = np.arange(walkable.size).reshape(self.mapshape)
+        across = walkable[:, :-1] & walkable[:, 1:]
+        down = walkable[:-1, :] & walkable[1:, :]
+        rows = np.concatenate((cells[:, :-1][across], cells[:-1, :][down]))
+        cols = np.concatenate((cells[:, 1:][across], cells[1:, :][down]))
+        graph = coo_matrix((np.ones(rows.size), (rows, cols)), shape=(walkable.size, walkable.size)).tocsr()
+        target = self.target[0] * self.mapshape[1] + self.target[1]
+        limit = np.inf if max_distance is None else max_distance
+        distance = dijkstra(graph, directed=False, indices=target, unweighted=True, limit=limit).reshape(self.mapshape)
+
+        # The target itself is always reachable, so the maximum is never taken of an empty array
+        reachable = np.isfinite(distance)
+        max_distance = distance[reachable].max() + 1
+        self.exploit_map = np.where(reachable, (max_distance - distance) / max_distance, 0.0)
+        return self.exploit_map
+
+    def compile_exploit_map(self) -> None:
+        """Compile the exploit map into the greedy successor of every tile.
+
+        Setting the exploit map or the target drops the compiled map, the
+        exploit methods compile it again on their next call.
+
+        Returns:
+            None
+        """
+        self.successor_map, self.successor_flags = compile_successor_field(self.exploit_map, self.target)
+
     def wipe_exploit_map(self) -> None:
         """Wipe the exploit map.
 
@@ -457,11 +542,17 @@ class Roboid:
 
     # Modi operandi
 
-    def explore_once(self, adjacent_pos_func: Callable) -> np.ndarray:
+    def explore_once(self, adjacent_pos_func: Callable, walker: Walker | None = None) -> np.ndarray:
         """Explore the map once.
 
+        The walk runs on integer cell indices without the checks of the
+        properties, position, steps and adjacent positions are set once at the end.
+        The next tile is chosen by the exploration policy.
+
         Args:
             adjacent_pos_func (Callable): function to calculate the adjacent positions
+            walker (Walker | None, optional): walker to reuse the queried adjacent positions of
+                earlier explorations on the same map. Defaults to None.
 
         Returns:
             self.exploit_map (np.ndarray): exploit map
@@ -470,22 +561,52 @@ class Roboid:
         # Setup
         self.wipe_memory_map()
         self.reset_pos()
+        if walker is None:
+            walker = Walker(self.mapshape, adjacent_pos_func, self.is_forbidden)
         iteration_stop = (self.mapshape[0] * self.mapshape[1]) ** 2
+        cols = self.mapshape[1]
+        cell = self.position[0] * cols + self.position[1]
+        target_cell = self.target[0] * cols + self.target[1]
+        steps = 0
+        memory = self.memory_map.reshape(-1)
+        options = walker.options.get
+        calc_options = walker.calc_options
+        if isinstance(self.policy, UniformPolicy):
+            choice = random.choice
+        else:
+            values = self.exploit_map.ravel().tolist()
+            policy_choose = self.policy.choose
+
+            def choice(cell_options: tuple[int, ...]) -> int:
+                return policy_choose(cell_options, values)
+        record = self.recorder.record if self.recorder is not None else None
+        if record is not None:
+            self.recorder.begin_episode()
+            record(cell)
 
         # Main loop
-        while not self.is_target():
-            adjacent_pos = self.calc_adjacent_pos_list()
-            self.adjacent_pos = adjacent_pos_func(adjacent_pos)
-            self.position = self.choose_adjacent_pos()
-            self.steps += 1
-            self.memory_map[self.position] = self.steps
+        while cell != target_cell:
+            cell_options = options(cell) or calc_options(cell)
+            if not cell_options:
+                print("No adjacent position is available, stopping exploration")
+                break
+            cell = choice(cell_options)
+            steps += 1
+            memory[cell] = steps
+            if record is not None:
+                record(cell)
 
-            if self.steps > iteration_stop:
+            if steps > iteration_stop:
                 # Stop exploration if too many iterations
                 print("Too many iterations, stopping exploration")
                 break
 
         # Wrap up
+        self.position = divmod(cell, cols)
+        self.steps = steps
+        self.adjacent_pos = adjacent_pos_func(walker.calc_adjacent_pos_list(cell))
+        if record is not None:
+            self.recorder.end_episode()
         self.calc_exploit_map()
         return self.exploit_map
 
@@ -499,9 +620,11 @@ class Roboid:
         Returns:
             self.exploit_map (np.ndarray): exploit map
         """
+        walker = Walker(self.mapshape, adjacent_pos_func, self.is_forbidden)
         self.num_explorations = 0
         while self.num_explorations < explorations:
-            self.explore_once(adjacent_pos_func)
+            self.policy.anneal(self.num_explorations)
+            self.explore_once(adjacent_pos_func, walker)
             if self.memory_map.max() <= self.calc_manhattan_distance():
                 # Stop exploration min distance is reached
                 print("Min distance reached, stopping exploration")
@@ -554,3 +677,145 @@ class Roboid:
         self.wipe_memory_map()
         self.wipe_exploit_map()
         return self.walk_map
+
+    def exploit_compiled(self) -> np.ndarray:
+        """Exploit the compiled exploit map by hopping along the successors.
+
+        Unlike exploit the maps are kept, so the compiled map can be walked again.
+
+        Returns:
+            self.walk_map (np.ndarray): walk map
+        """
+        if self.successor_map is None:
+            self.compile_exploit_map()
+
+        # Setup
+        self.reset_pos()
+        self.wipe_walk_map()
+        cols = self.mapshape[1]
+        cell = self.position[0] * cols + self.position[1]
+        walk_map = self.walk_map.reshape(-1)
+
+        # Main loop, stops at the target, a dead end or before revisiting a tile
+        steps = 1
+        walk_map[cell] = steps
+        next_cell = self.successor_map[cell]
+        while next_cell != cell and walk_map[next_cell] == 0:
+            cell = next_cell
+            steps += 1
+            walk_map[cell] = steps
+            next_cell = self.successor_map[cell]
+
+        # Wrap up
+        self.steps = steps
+        self.position = divmod(int(cell), cols)
+        return self.walk_map
+
+    def exploit_batch(self, starts: list[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+        """Exploit the compiled exploit map from many start positions at once.
+
+        Args:
+            starts (list[tuple[int, int]]): start positions
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: steps like exploit counts them and if the target was reached, per start
+        """
+        if self.successor_map is None:
+            self.compile_exploit_map()
+        for start in starts:
+            self.check_pos_is_valid(start)
+        cols = self.mapshape[1]
+        start_cells = np.array([x * cols + y for x, y in starts], dtype=np.int64)
+        ends, hops = walk_successor_field(self.successor_map, self.successor_flags, start_cells)
+        reached = ends == self.target[0] * cols + self.target[1]
+        return hops + 1, reached
+
+
+def test_exploit_batch_follows_new_target() -> None:
+    walkable = np.ones((6, 6), dtype=bool)
+    walkable[1:5, 2] = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = Roboid((6, 6), start=(0, 0), target=(5, 0))
+    starts = [tuple(pos) for pos in np.argwhere(walkable)]
+    model.calc_diffusion_map(walkable)
+    assert model.exploit_batch(starts)[1].all()
+
+    model.target = (0, 5)
+    model.calc_diffusion_map(walkable)
+    steps, reached = model.exploit_batch(starts)
+    assert reached.all()
+    assert steps[starts.index((0, 0))] == 6
+
+
+def test_calc_diffusion_map() -> None:
+    walkable = np.ones((4, 5), dtype=bool)
+    for wall in ((0, 2), (0, 3), (1, 1), (1, 2), (1, 4), (2, 4), (3, 0), (3, 1)):
+        walkable[wall] = False
+    # Shortest path lengths to (0, 0) counted by hand, (0, 4) is walled in
+    inf = np.inf
+    distance = np.array([
+        [0, 1, inf, inf, inf],
+        [1, inf, inf, 6, inf],
+        [2, 3, 4, 5, inf],
+        [inf, inf, 5, 6, 7]])
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = Roboid((4, 5), start=(2, 2), target=(0, 0))
+    expected = np.where(np.isfinite(distance), (8 - distance) / 8, 0.0)
+    assert np.allclose(model.calc_diffusion_map(walkable), expected)
+
+    # Farther tiles than max_distance count as unreachable
+    near = np.where(distance <= 4, (5 - distance) / 5, 0.0)
+    assert np.allclose(model.calc_diffusion_map(walkable, max_distance=4), near)
+
+    model.target = (1, 1)
+    try:
+        model.calc_diffusion_map(walkable)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('A target on a wall must raise')
+
+
+def test_explore_matches_checked_walk() -> None:
+    # The walk of the cached walker must draw the same tiles as the checked loop on the properties
+    rng = np.random.default_rng(3)
+    grid = np.where(rng.random((12, 12)) < 0.2, -1, 1)
+    grid[[0, -1], :] = -1
+    grid[:, [0, -1]] = -1
+    grid[1, 1] = grid[10, 10] = 1
+    reachable = Roboid((12, 12), start=(1, 1), target=(10, 10))
+    reachable.calc_diffusion_map(grid >= 0)
+    assert reachable.exploit_map[1, 1] > 0
+
+    def adjacent_pos(positions: list[tuple[int, int]]) -> dict[tuple[int, int], int]:
+        return {pos: grid[pos] for pos in positions}
+
+    checked = Roboid((12, 12), start=(1, 1), target=(10, 10))
+    cached = Roboid((12, 12), start=(1, 1), target=(10, 10))
+    walker = Walker(cached.mapshape, adjacent_pos, cached.is_forbidden)
+    for episode in range(5):
+        random.seed(episode)
+        checked.wipe_memory_map()
+        checked.reset_pos()
+        while not checked.is_target():
+            checked.adjacent_pos = adjacent_pos(checked.calc_adjacent_pos_list())
+            checked.position = checked.choose_adjacent_pos()
+            checked.steps += 1
+            checked.memory_map[checked.position] = checked.steps
+        checked.calc_exploit_map()
+
+        random.seed(episode)
+        cached.explore_once(adjacent_pos, walker)
+        assert cached.steps == checked.steps and cached.position == checked.position
+        assert np.array_equal(cached.memory_map, checked.memory_map)
+        assert np.array_equal(cached.exploit_map, checked.exploit_map)
+
+
+def test_explore_stops_without_options() -> None:
+    grid = np.full((5, 5), -1)
+    grid[1, 1] = grid[3, 3] = 1
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        model = Roboid((5, 5), start=(1, 1), target=(3, 3))
+        model.explore_once(lambda positions: {pos: grid[pos] for pos in positions})
+    assert model.steps == 0 and model.position == (1, 1) and not model.exploit_map.any()
+    assert 'No adjacent position' in output.getvalue()
@@ -0,0 +1,158 @@
+import math
+import random
+from typing import Sequence
+
+
+class UniformPolicy:
+    """Choose the next tile uniformly at random, ignoring the exploit map."""
+
+    def anneal(self, episode: int) -> None:
+        """Adapt the policy to the episode, nothing to adapt.
+
+        Args:
+            episode (int): number of the exploration, starting at 0
+
+        Returns:
+            None
+        """
+
+    def choose(self, options: tuple[int, ...], values: Sequence[float]) -> int:
+        """Choose the next cell.
+
+        Args:
+            options (tuple[int, ...]): reachable cell indices
+            values (Sequence[float]): flat exploit map
+
+        Returns:
+            int: chosen cell index
+        """
+        return random.choice(options)
+
+
+class EpsilonGreedyPolicy:
+    """Choose the tile with the highest exploit value, with probability epsilon a random one."""
+
+    def __init__(self, epsilon: float = 0.3, decay: float = 0.9, epsilon_min: float = 0.01) -> None:
+        """Create an epsilon-greedy policy, epsilon decays exponentially over the episodes.
+
+        Args:
+            epsilon (float, optional): probability of a random choice in the first episode. Defaults to 0.3.
+            decay (float, optional): factor applied to epsilon per episode. Defaults to 0.9.
+            epsilon_min (float, optional): lower bound of epsilon. Defaults to 0.01.
+        """
+        if not 0 <= epsilon_min <= epsilon <= 1:
+            raise ValueError("Epsilon must be in [epsilon_min, 1] and epsilon_min positive.")
+        if not 0 < decay <= 1:
+            raise ValueError("Decay must be in (0, 1].")
+        self.epsilon_start = epsilon
+        self.decay = decay
+        self.epsilon_min = epsilon_min
+        self.epsilon = epsilon
+
+    def anneal(self, episode: int) -> None:
+        """Set epsilon for the episode.
+
+        Args:
+            episode (int): number of the exploration, starting at 0
+
+        Returns:
+            None
+        """
+        self.epsilon = max(self.epsilon_min, self.epsilon_start * self.decay ** episode)
+
+    def choose(self, options: tuple[int, ...], values: Sequence[float]) -> int:
+        """Choose the next cell, ties between the best cells are broken at random.
+
+        Args:
+            options (tuple[int, ...]): reachable cell indices
+            values (Sequence[float]): flat exploit map
+
+        Returns:
+            int: chosen cell index
+        """
+        if random.random() < self.epsilon:
+            return random.choice(options)
+        best_value = max(values[cell] for cell in options)
+        return random.choice([cell for cell in options if values[cell] == best_value])
+
+
+class SoftmaxPolicy:
+    """Choose tiles with probabilities of the softmax of their exploit values."""
+
+    def __init__(self, temperature: float = 0.1, decay: float = 0.9, temperature_min: float = 0.01) -> None:
+        """Create a softmax policy, the temperature decays exponentially over the episodes.
+
+        Args:
+            temperature (float, optional): temperature in the first episode. Defaults to 0.1.
+            decay (float, optional): factor applied to the temperature per episode. Defaults to 0.9.
+            temperature_min (float, optional): lower bound of the temperature. Defaults to 0.01.
+        """
+        if not 0 < temperature_min <= temperature:
+            raise ValueError("Temperature must be at least temperature_min and temperature_min positive.")
+        if not 0 < decay <= 1:
+            raise ValueError("Decay must be in (0, 1].")
+        self.temperature_start = temperature
+        self.decay = decay
+        self.temperature_min = temperature_min
+        self.temperature = temperature
+
+    def anneal(self, episode: int) -> None:
+        """Set the temperature for the episode.
+
+        Args:
+            episode (int): number of the exploration, starting at 0
+
+        Returns:
+            None
+        """
+        self.temperature = max(self.temperature_min, self.temperature_start * self.decay ** episode)
+
+    def choose(self, options: tuple[int, ...], values: Sequence[float]) -> int:
+        """Choose the next cell.
+
+        Args:
+            options (tuple[int, ...]): reachable cell indices
+            values (Sequence[float]): flat exploit map
+
+        Returns:
+            int: chosen cell index
+        """
+        best_value = max(values[cell] for cell in options)
+        weights = [math.exp((values[cell] - best_value) / self.temperature) for cell in options]
+        return random.choices(options, weights)[0]
+
+
+POLICIES = {
+    'uniform': UniformPolicy,
+    'epsilon': EpsilonGreedyPolicy,
+    'softmax': SoftmaxPolicy
+}
+
+
+def test_epsilon_decays_to_minimum() -> None:
+    policy = POLICIES['epsilon'](epsilon=0.5, decay=0.5, epsilon_min=0.05)
+    assert isinstance(policy, EpsilonGreedyPolicy)
+    policy.anneal(0)
+    assert policy.epsilon == 0.5
+    policy.anneal(1)
+    assert policy.epsilon == 0.25
+    policy.anneal(100)
+    assert policy.epsilon == 0.05
+
+
+def test_epsilon_zero_is_greedy() -> None:
+    policy = EpsilonGreedyPolicy(epsilon=0, epsilon_min=0)
+    values = [0.1, 0.7, 0.3, 0.7, 0.9, 0.2]
+    random.seed(0)
+    assert all(policy.choose((0, 1, 2, 3), values) in (1, 3) for _ in range(100))
+    assert all(policy.choose((0, 2, 4, 5), values) == 4 for _ in range(100))
+
+
+def test_softmax_is_deterministic_for_seed() -> None:
+    policy = SoftmaxPolicy(temperature=0.5)
+    values = [0.1, 0.7, 0.3, 0.7, 0.9, 0.2]
+    draws = []
+    for _ in range(2):
+        random.seed(7)
+        draws.append([policy.choose((0, 1, 2, 3, 4, 5), values) for _ in range(50)])
+    assert draws[0] == draws[1] and len(set(draws[0])) > 1
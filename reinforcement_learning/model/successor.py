@@ -0,0 +1,84 @@
+import numpy as np
+
+# Flags of the successor field
+DEAD_END = 1  # no adjacent tile with a positive exploit value, a walk stops here
+CYCLE = 2  # the greedy walk from this tile runs into a cycle and never stops
+
+
+def compile_successor_field(exploit_map: np.ndarray, target: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Compile an exploit map into the greedy next tile of every tile.
+
+    The successor of a tile is the adjacent tile with the highest positive
+    exploit value, ties go to the first tile in the order of
+    Roboid.calc_adjacent_pos_list. The target and dead ends are their own
+    successors. Unlike Roboid.exploit the field can't skip visited tiles,
+    walks which would revisit a tile are flagged as cycles instead.
+
+    Args:
+        exploit_map (np.ndarray): exploit map
+        target (tuple[int, int]): target position
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: successor cell index and flags per cell, both flat
+    """
+    rows, cols = exploit_map.shape
+    cells = np.arange(rows * cols).reshape(rows, cols)
+
+    # Values of the adjacent tiles in the order up, down, left, right
+    values = np.full((4, rows, cols), -np.inf)
+    values[0, 1:, :] = exploit_map[:-1, :]
+    values[1, :-1, :] = exploit_map[1:, :]
+    values[2, :, 1:] = exploit_map[:, :-1]
+    values[3, :, :-1] = exploit_map[:, 1:]
+    offsets = np.array([-cols, cols, -1, 1]).reshape(4, 1, 1)
+
+    best = values.argmax(axis=0)
+    has_successor = np.take_along_axis(values, best[np.newaxis], axis=0)[0] > 0
+    successor = np.where(has_successor, cells + offsets[best, 0, 0], cells).ravel()
+    flags = np.where(has_successor, 0, DEAD_END).astype(np.uint8).ravel()
+    target_cell = target[0] * cols + target[1]
+    successor[target_cell] = target_cell
+    flags[target_cell] = 0
+
+    # Pointer doubling, after n hops every walk is either at its end or inside a cycle
+    jump = successor.copy()
+    for _ in range(max(1, int(np.ceil(np.log2(successor.size))))):
+        jump = jump[jump]
+    flags[successor[jump] != jump] |= CYCLE
+    return successor, flags
+
+
+def walk_successor_field(
+        successor: np.ndarray,
+        flags: np.ndarray,
+        starts: np.ndarray,
+        max_steps: int | None = None
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Walk from many start cells at once along the successor field.
+
+    Args:
+        successor (np.ndarray): successor cell index per cell
+        flags (np.ndarray): flags per cell
+        starts (np.ndarray): start cell indices
+        max_steps (int | None, optional): Max number of hops. If None, the number of cells.
+            Defaults to None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: end cell and number of hops per start, walks into a cycle end at -1
+    """
+    if max_steps is None:
+        max_steps = successor.size
+    position = np.asarray(starts, dtype=np.int64).copy()
+    hops = np.zeros(position.shape, dtype=np.int64)
+    cyclic = (flags[position] & CYCLE).astype(bool)
+    active = np.flatnonzero(~cyclic & (successor[position] != position))
+
+    for _ in range(max_steps):
+        if active.size == 0:
+            break
+        position[active] = successor[position[active]]
+        hops[active] += 1
+        active = active[successor[position[active]] != position[active]]
+
+    position[cyclic] = -1
+    return position, hops
@@ -0,0 +1,300 @@
+import os
+import struct
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+# File layout (little endian):
+#   header: MAGIC, int32 rows, int32 columns
+#   chunks: int32 n_values, int32 n_ends, int32 itemsize,
+#           int{8,16,32} deltas[n_values], int32 ends[n_ends], int32 firsts[n_starts]
+# Values are cell indices (row * columns + column). Within an episode a step moves by -columns,
+# -1, 0, 1 or columns, so the deltas are stored in the smallest integer type that holds them,
+# usually one or two bytes instead of four. The first cell of the chunk and the first cell
+# after every episode end are stored absolute in firsts, their deltas are 0. Ends are the
+# offsets into the values of the chunk where an episode ends, an episode without an end in
+# the chunk continues in the next chunk.
+MAGIC = b'RLTRAJ02'
+HEADER = struct.Struct('<8sii')
+CHUNK_HEADER = struct.Struct('<iii')
+DELTA_TYPES = {1: '<i1', 2: '<i2', 4: '<i4'}
+
+
+def episode_starts(num_values: int, ends: np.ndarray) -> np.ndarray:
+    """Offsets of the absolute values of a chunk.
+
+    Args:
+        num_values (int): number of values in the chunk
+        ends (np.ndarray): episode ends of the chunk
+
+    Returns:
+        np.ndarray: offsets of the chunk start and of every episode start in the chunk
+    """
+    if num_values == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.unique(np.concatenate(([0], ends[ends < num_values]))).astype(np.int64)
+
+
+def delta_encode(cells: np.ndarray, starts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Delta encode cell indices, the values at the start offsets are split off as absolute values.
+
+    Args:
+        cells (np.ndarray): cell indices
+        starts (np.ndarray): offsets of the absolute values
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: deltas in the smallest fitting integer type, absolute values
+    """
+    deltas = np.diff(cells.astype(np.int64), prepend=0)
+    deltas[starts] = 0
+    span = int(np.abs(deltas).max(initial=0))
+    itemsize = 1 if span <= np.iinfo(np.int8).max else 2 if span <= np.iinfo(np.int16).max else 4
+    return deltas.astype(DELTA_TYPES[itemsize]), cells[starts].astype(np.int32)
+
+
+def delta_decode(deltas: np.ndarray, firsts: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Decode delta encoded values, the running sum restarts at every start offset.
+
+    Args:
+        deltas (np.ndarray): delta encoded values
+        firsts (np.ndarray): absolute value at every start offset
+        starts (np.ndarray): sorted offsets of the absolute values, including 0
+
+    Returns:
+        np.ndarray: cell indices
+    """
+    values = deltas.astype(np.int64)
+    values[starts] = firsts
+    running = np.cumsum(values)
+    # Subtract the running sum in front of the start of the segment every value belongs to
+    before = np.concatenate(([0], running))[starts]
+    segment = np.searchsorted(starts, np.arange(values.size), side='right') - 1
+    return (running - before[segment]).astype(np.int32)
+
+
+class TrajectoryRecorder:
+
+    def __init__(self, path: str, mapshape: tuple[int, int], chunk_size: int = 65536) -> None:
+        """Append the walked cells of every episode to a chunked trajectory file.
+
+        At most chunk_size cells are held in memory, full chunks are written to
+        disk, even in the middle of an episode. An existing file is appended to.
+
+        Args:
+            path (str): path to the trajectory file
+            mapshape (tuple[int, int]): shape of the map the cell indices refer to
+            chunk_size (int, optional): number of cells per chunk. Defaults to 65536.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive.")
+        self.path = path
+        self.mapshape = mapshape
+        self.chunk_size = chunk_size
+
+        self._cells = np.empty(chunk_size, dtype=np.int32)
+        self._num_cells = 0
+        self._ends: list[int] = []
+        self._in_episode = False
+        self._num_episodes = 0
+
+        self._file: BinaryIO = self._open()
+
+    def _open(self) -> BinaryIO:
+        """Open the file for appending, write the header to new files.
+
+        Returns:
+            BinaryIO: opened file
+
+        Raises:
+            ValueError: if an existing file has a different format or map shape
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, 'rb') as file:
+                magic, rows, cols = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("File is not a trajectory file.")
+            if (rows, cols) != tuple(self.mapshape):
+                raise ValueError("Map shape does not match the trajectory file.")
+            return open(self.path, 'ab')
+        file = open(self.path, 'wb')
+        file.write(HEADER.pack(MAGIC, *self.mapshape))
+        return file
+
+    @property
+    def num_episodes(self) -> int:
+        """Get the number of episodes recorded by this recorder.
+
+        Returns:
+            int: number of episodes
+        """
+        return self._num_episodes
+
+    def begin_episode(self) -> None:
+        """Begin a new episode, an unfinished episode is ended first.
+
+        Returns:
+            None
+        """
+        if self._in_episode:
+            self.end_episode()
+        self._in_episode = True
+
+    def record(self, cell: int) -> None:
+        """Record a walked cell of the current episode.
+
+        Args:
+            cell (int): cell index (row * columns + column)
+
+        Returns:
+            None
+        """
+        if self._num_cells == self.chunk_size:
+            self.flush()
+        self._cells[self._num_cells] = cell
+        self._num_cells += 1
+
+    def end_episode(self) -> None:
+        """End the current episode.
+
+        Returns:
+            None
+        """
+        if not self._in_episode:
+            return
+        self._ends.append(self._num_cells)
+        self._in_episode = False
+        self._num_episodes += 1
+        if len(self._ends) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered cells as a chunk to the file.
+
+        Returns:
+            None
+        """
+        if self._num_cells == 0 and not self._ends:
+            return
+        cells = self._cells[:self._num_cells]
+        ends = np.array(self._ends, dtype=np.int32)
+        starts = episode_starts(cells.size, ends)
+        deltas, firsts = delta_encode(cells, starts)
+        self._file.write(CHUNK_HEADER.pack(cells.size, ends.size, deltas.itemsize))
+        self._file.write(deltas.tobytes())
+        self._file.write(ends.astype('<i4').tobytes())
+        self._file.write(firsts.astype('<i4').tobytes())
+        self._file.flush()
+        self._num_cells = 0
+        self._ends.clear()
+
+    def close(self) -> None:
+        """End the current episode, flush and close the file.
+
+        Returns:
+            None
+        """
+        if self._file.closed:
+            return
+        self.end_episode()
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> 'TrajectoryRecorder':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class TrajectoryReader:
+
+    def __init__(self, path: str) -> None:
+        """Stream the episodes of a trajectory file lazily, one chunk at a time.
+
+        Args:
+            path (str): path to the trajectory file
+
+        Raises:
+            ValueError: if the file is not a trajectory file
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            magic, rows, cols = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("File is not a trajectory file.")
+        self.mapshape = (rows, cols)
+
+    def chunks(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Read the chunks of the file.
+
+        Returns:
+            Iterator[tuple[np.ndarray, np.ndarray]]: decoded cell indices and episode ends per chunk
+        """
+        with open(self.path, 'rb') as file:
+            file.seek(HEADER.size)
+            while header := file.read(CHUNK_HEADER.size):
+                num_values, num_ends, itemsize = CHUNK_HEADER.unpack(header)
+                deltas = np.fromfile(file, dtype=DELTA_TYPES[itemsize], count=num_values)
+                ends = np.fromfile(file, dtype='<i4', count=num_ends)
+                starts = episode_starts(num_values, ends)
+                firsts = np.fromfile(file, dtype='<i4', count=starts.size)
+                yield delta_decode(deltas, firsts, starts), ends
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Iterate over the episodes.
+
+        Returns:
+            Iterator[np.ndarray]: cell indices of every episode
+        """
+        pending: list[np.ndarray] = []
+        for cells, ends in self.chunks():
+            begin = 0
+            for end in ends:
+                pending.append(cells[begin:end])
+                yield np.concatenate(pending)
+                pending = []
+                begin = end
+            if begin < cells.size:
+                pending.append(cells[begin:])
+
+    def positions(self) -> Iterator[np.ndarray]:
+        """Iterate over the episodes as positions for replays.
+
+        Returns:
+            Iterator[np.ndarray]: (row, column) positions of every episode with shape (steps, 2)
+        """
+        for cells in self:
+            yield np.column_stack(np.unravel_index(cells, self.mapshape))
+
+
+def test_trajectory_roundtrip(tmp_path) -> None:
+    rng = np.random.default_rng(0)
+    mapshape = (12, 12)
+    steps = np.array([-mapshape[1], mapshape[1], -1, 1])
+    episodes = []
+    for _ in range(6):
+        walk = [int(rng.integers(mapshape[0] * mapshape[1]))]
+        for step in rng.choice(steps, int(rng.integers(1, 50))):
+            walk.append(int(np.clip(walk[-1] + step, 0, mapshape[0] * mapshape[1] - 1)))
+        episodes.append(np.array(walk, dtype=np.int32))
+
+    path = str(tmp_path / 'walks.traj')
+    with TrajectoryRecorder(path, mapshape) as recorder:
+        for walk in episodes:
+            recorder.begin_episode()
+            for cell in walk:
+                recorder.record(cell)
+    # All episodes share one chunk, the deltas fit a single byte
+    assert len(list(TrajectoryReader(path).chunks())) == 1
+    assert os.path.getsize(path) < HEADER.size + CHUNK_HEADER.size + sum(walk.size for walk in episodes) + 4 * 12 + 4
+    for read, walk in zip(TrajectoryReader(path), episodes, strict=True):
+        assert np.array_equal(read, walk)
+
+    # Small chunks split episodes, appending continues the file
+    with TrajectoryRecorder(path, mapshape, chunk_size=7) as recorder:
+        for walk in episodes:
+            recorder.begin_episode()
+            for cell in walk:
+                recorder.record(cell)
+    for read, walk in zip(TrajectoryReader(path), episodes + episodes, strict=True):
+        assert np.array_equal(read, walk)
@@ -0,0 +1,65 @@
+from typing import Callable
+
+
+class Walker:
+    """Unchecked walker state for the exploration hot loop.
+
+    Positions are flat cell indices (row * columns + column). The allowed
+    adjacent cells of a cell are queried once through the adjacent position
+    function and validated when the cell is first reached, afterwards a step
+    is a plain dict lookup. Only reached cells are cached, so the cache stays
+    small on large maps with short walks.
+    """
+
+    __slots__ = ('mapshape', 'cols', 'adjacent_pos_func', 'is_forbidden', 'options')
+
+    def __init__(
+            self,
+            mapshape: tuple[int, int],
+            adjacent_pos_func: Callable,
+            is_forbidden: Callable[[float], bool]
+            ) -> None:
+        """Create a walker for one map.
+
+        Args:
+            mapshape (tuple[int, int]): map shape
+            adjacent_pos_func (Callable): function to get the values of the adjacent positions
+            is_forbidden (Callable[[float], bool]): function to check if a position value is forbidden
+        """
+        self.mapshape = mapshape
+        self.cols = mapshape[1]
+        self.adjacent_pos_func = adjacent_pos_func
+        self.is_forbidden = is_forbidden
+        self.options: dict[int, tuple[int, ...]] = {}
+
+    def calc_adjacent_pos_list(self, cell: int) -> list[tuple[int, int]]:
+        """Calculate the adjacent positions of a cell inside the map.
+
+        The order up, down, left, right matches Roboid.calc_adjacent_pos_list,
+        so random choices draw the same tiles as the checked path.
+
+        Args:
+            cell (int): cell index
+
+        Returns:
+            list[tuple[int, int]]: adjacent positions
+        """
+        x, y = divmod(cell, self.cols)
+        return [
+            pos for pos in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+            if 0 <= pos[0] < self.mapshape[0] and 0 <= pos[1] < self.mapshape[1]
+        ]
+
+    def calc_options(self, cell: int) -> tuple[int, ...]:
+        """Calculate and cache the cells which can be reached from a cell.
+
+        Args:
+            cell (int): cell index
+
+        Returns:
+            tuple[int, ...]: reachable cell indices, empty if none is reachable
+        """
+        values = self.adjacent_pos_func(self.calc_adjacent_pos_list(cell))
+        options = tuple(pos[0] * self.cols + pos[1] for pos in values if not self.is_forbidden(values[pos]))
+        self.options[cell] = options
+        return options
@@ -1,6 +1,5 @@
 from typing import Protocol, Callable
 
-from matplotlib import pyplot as plt
 import numpy as np
 
 
@@ -40,6 +39,9 @@ class Model(Protocol):
     def exploit(self) -> np.ndarray:
         ...
 
+    def calc_diffusion_map(self, walkable: np.ndarray, max_distance: int | None = None) -> np.ndarray:
+        ...
+
     def calc_manhattan_distance(self) -> int:
         ...
 
@@ -114,6 +116,24 @@ class Presenter:
             metrics = f'Explorations: {explorations}; Steps: {distance}; Optimal: {optimal}; S: {start}; T: {target}'
             self.view.show_map(show_map, 'heatmap', metrics, start, target)
 
+    def run_diffusion(self, start: tuple[int, int], target: tuple[int, int], show_results=False) -> None:
+        """Run the diffusion over the map instead of explorations.
+
+        Args:
+            start (tuple[int, int]): start position
+            target (tuple[int, int]): target position
+
+        Returns:
+            None
+        """
+        print('Starting diffusion...')
+        exploit_map = self.model.calc_diffusion_map(self.view.map >= 0)
+        show_map = self.view.map + exploit_map
+        if show_results:
+            optimal = self.model.calc_manhattan_distance() + 1
+            metrics = f'Diffusion; Optimal: {optimal}; S: {start}; T: {target}'
+            self.view.show_map(show_map, 'heatmap', metrics, start, target)
+
     def run_exploitation(self, start: tuple[int, int], target: tuple[int, int], show_results=False) -> float:
         """Run exploitation.
 
@@ -136,7 +156,9 @@ class Presenter:
             self.view.show_map(show_map, 'heatmap', metrics, start, target)
         return f_rel, show_map
 
-    def run(self, explorations: int = 1, repetitions: int = 1, show_intermediate_results=False) -> None:
+    def run(self, explorations: int = 1, repetitions: int = 1, show_intermediate_results=False, diffusion=False) -> None:
+        from matplotlib import pyplot as plt
+
         print('Running presenter...')
         self.view.load_map_from_image('reinforcement_learning/view/testmap.png')
         start = self.model.start[::-1]
@@ -148,7 +170,10 @@ class Presenter:
         best_map = None
         while len(training_results) < repetitions:
             print(f'\nRepetition: {len(training_results) + 1}')
-            self.run_exploration(explorations, start, target, show_intermediate_results)
+            if diffusion:
+                self.run_diffusion(start, target, show_intermediate_results)
+            else:
+                self.run_exploration(explorations, start, target, show_intermediate_results)
             f_rel, _map = self.run_exploitation(start, target, show_intermediate_results)
             training_results.append(f_rel)
             print(f'f_rel: {f_rel * 100:.2f}%')
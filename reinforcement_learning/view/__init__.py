@@ -1,12 +1,17 @@
+from __future__ import annotations
+
 import argparse
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 import numpy as np
-import seaborn as sns
-from matplotlib import pyplot as plt
-from matplotlib.patches import Circle
-from PIL import Image
-from scipy import ndimage
+
+# Plotting and image libraries are slow to import, they are loaded on first use
+if TYPE_CHECKING:
+    from matplotlib import pyplot as plt
+
+# Tile values of generated maps, they survive a round trip through save/load
+FREE = 1.0
+WALL = -1.0
 
 
 class Environment:
@@ -16,6 +21,11 @@ class Environment:
             'heatmap': self.heatmap,
             'contourmap': self.contourmap
         }
+        self._map_generators: dict[str, Callable] = {
+            'maze': self.create_maze_map,
+            'rooms': self.create_rooms_map,
+            'blobs': self.create_blob_map
+        }
         self.mapsize = mapsize
         self.map = self.create_empty_map(borders=True)
 
@@ -76,6 +86,15 @@ class Environment:
         """
         return self._info_layers
 
+    @property
+    def map_generators(self) -> dict[str, Callable]:
+        """Get the seeded map generators.
+
+        Returns:
+            dict[str, Callable]: map generators
+        """
+        return self._map_generators
+
     # Map creation methods
 
     def create_empty_map(self, borders: bool = False) -> np.ndarray:
@@ -106,6 +125,152 @@ class Environment:
             _map = self.place_borders(_map)
         return _map
 
+    def create_maze_map(self, seed: int | None = None, borders: bool = True) -> np.ndarray:
+        """Create a perfect maze with the binary tree algorithm.
+
+        Cells sit on odd coordinates, every cell carves the wall to its north
+        or west neighbor, which yields a spanning tree over all cells.
+
+        Args:
+            seed (int | None, optional): Seed for reproducible maps. Defaults to None.
+            borders (bool, optional): Place borders. Defaults to True.
+
+        Returns:
+            np.ndarray: maze map with free tiles set to 1 and walls to -1
+        """
+        rng = np.random.default_rng(seed)
+        _map = np.full(self.mapsize, WALL, dtype=np.float64)
+        rows = np.arange(1, self.mapsize[0] - 1, 2)
+        cols = np.arange(1, self.mapsize[1] - 1, 2)
+        _map[np.ix_(rows, cols)] = FREE
+
+        # Carve north (True) or west (False), the first row and column have only one choice
+        carve_north = rng.random((rows.size, cols.size)) < 0.5
+        carve_north[0, :] = False
+        carve_north[:, 0] = True
+        carve_north[0, 0] = False
+        cell_rows, cell_cols = np.meshgrid(rows, cols, indexing='ij')
+        north = carve_north & (cell_rows > 1)
+        west = ~carve_north & (cell_cols > 1)
+        _map[cell_rows[north] - 1, cell_cols[north]] = FREE
+        _map[cell_rows[west], cell_cols[west] - 1] = FREE
+
+        if borders:
+            _map = self.place_borders(_map)
+        return _map
+
+    def create_rooms_map(
+            self,
+            seed: int | None = None,
+            n_rooms: int | None = None,
+            room_size: tuple[int, int] = (3, 8),
+            borders: bool = True
+            ) -> np.ndarray:
+        """Create a map of rectangular rooms chained together by L-shaped corridors.
+
+        Args:
+            seed (int | None, optional): Seed for reproducible maps. Defaults to None.
+            n_rooms (int | None, optional): Number of rooms. If None, one room per 100 tiles.
+                Defaults to None.
+            room_size (tuple[int, int], optional): Min and max side length of a room. Defaults to (3, 8).
+            borders (bool, optional): Place borders. Defaults to True.
+
+        Returns:
+            np.ndarray: rooms map with free tiles set to 1 and walls to -1
+        """
+        rng = np.random.default_rng(seed)
+        rows, cols = self.mapsize
+        if n_rooms is None:
+            n_rooms = max(2, rows * cols // 100)
+        min_size = max(1, min(room_size[0], rows - 2, cols - 2))
+        max_size = max(min_size, min(room_size[1], rows - 2, cols - 2))
+
+        # Rooms as rectangles [r0, r1) x [c0, c1) inside the borders
+        heights = rng.integers(min_size, max_size + 1, n_rooms)
+        widths = rng.integers(min_size, max_size + 1, n_rooms)
+        r0 = rng.integers(1, rows - heights, endpoint=True)
+        c0 = rng.integers(1, cols - widths, endpoint=True)
+        r1 = np.minimum(r0 + heights, rows - 1)
+        c1 = np.minimum(c0 + widths, cols - 1)
+
+        # Paint all rooms at once with a 2D difference array
+        diff = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+        np.add.at(diff, (r0, c0), 1)
+        np.add.at(diff, (r0, c1), -1)
+        np.add.at(diff, (r1, c0), -1)
+        np.add.at(diff, (r1, c1), 1)
+        free = diff.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+        # Chain the rooms in serpentine order through horizontal bands to keep the corridors short
+        center_r = (r0 + r1 - 1) // 2
+        center_c = (c0 + c1 - 1) // 2
+        band = center_r // (2 * max_size)
+        order = np.lexsort((np.where(band % 2 == 0, center_c, -center_c), band))
+        center_r = center_r[order]
+        center_c = center_c[order]
+
+        # Connect the centers of consecutive rooms, first along the row then along the column
+        r_from, r_to = center_r[:-1], center_r[1:]
+        c_from, c_to = center_c[:-1], center_c[1:]
+        horizontal = np.zeros((rows, cols + 1), dtype=np.int64)
+        np.add.at(horizontal, (r_from, np.minimum(c_from, c_to)), 1)
+        np.add.at(horizontal, (r_from, np.maximum(c_from, c_to) + 1), -1)
+        vertical = np.zeros((rows + 1, cols), dtype=np.int64)
+        np.add.at(vertical, (np.minimum(r_from, r_to), c_to), 1)
+        np.add.at(vertical, (np.maximum(r_from, r_to) + 1, c_to), -1)
+        free |= horizontal.cumsum(axis=1)[:, :cols] > 0
+        free |= vertical.cumsum(axis=0)[:rows, :] > 0
+
+        _map = np.where(free, FREE, WALL)
+        if borders:
+            _map = self.place_borders(_map)
+        return _map
+
+    def create_blob_map(
+            self,
+            seed: int | None = None,
+            density: float = 0.3,
+            blob_size: float = 2.0,
+            borders: bool = True
+            ) -> np.ndarray:
+        """Create a map with smooth blob shaped obstacles.
+
+        Smoothed noise is thresholded to the requested wall density. Free tiles
+        which are not connected to the largest free area are filled up, so every
+        free tile can be reached.
+
+        Args:
+            seed (int | None, optional): Seed for reproducible maps. Defaults to None.
+            density (float, optional): Fraction of tiles covered by obstacles. Defaults to 0.3.
+            blob_size (float, optional): Standard deviation of the smoothing in tiles. Defaults to 2.0.
+            borders (bool, optional): Place borders. Defaults to True.
+
+        Returns:
+            np.ndarray: blob map with free tiles set to 1 and walls to -1
+        """
+        from scipy import ndimage
+
+        if not 0 <= density < 1:
+            raise ValueError('Density must be in [0, 1).')
+        rng = np.random.default_rng(seed)
+        noise = ndimage.gaussian_filter(rng.random(self.mapsize), sigma=blob_size)
+        walls = noise > np.quantile(noise, 1 - density) if density > 0 else np.zeros(self.mapsize, dtype=bool)
+        if borders:
+            walls[[0, -1], :] = True
+            walls[:, [0, -1]] = True
+
+        # Keep only the largest 4-connected free area
+        labels, n_labels = ndimage.label(~walls)
+        if n_labels > 1:
+            sizes = np.bincount(labels.ravel())
+            sizes[0] = 0
+            walls = labels != sizes.argmax()
+
+        _map = np.where(walls, WALL, FREE)
+        if borders:
+            _map = self.place_borders(_map)
+        return _map
+
     def place_borders(self, _map: np.ndarray) -> np.ndarray:
         """Place borders around the map. A border is a negative value.
 
@@ -131,8 +296,11 @@ class Environment:
         Returns:
             np.ndarray: map loaded from the image
         """
+        from PIL import Image
+
         image = Image.open(image_path)
-        self.mapsize = image.size
+        # PIL reports (width, height), maps are indexed (row, column)
+        self.mapsize = image.size[::-1]
         image = np.array(image, dtype=np.float64)
         image = image[:, :, 0] / 255 if image.ndim == 3 else image / 255
         threshold = 0 >= image
@@ -151,6 +319,8 @@ class Environment:
         Returns:
             None
         """
+        from PIL import Image
+
         _map = self.map.copy()
         threshold = 0 > _map
         _map[threshold] = 0
@@ -169,6 +339,8 @@ class Environment:
         Returns:
             None
         """
+        from scipy import ndimage
+
         blurred_map = ndimage.gaussian_filter(_map, sigma=0.5)
         map_axis = [np.array(range(size)) for size in self.mapsize]
         loc = [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]
@@ -186,6 +358,8 @@ class Environment:
             ax (plt.Axes): Axes object to be used for visualization
             cbar (bool, optional): Show colorbar. Defaults to True.
         """
+        import seaborn as sns
+
         ax.xaxis.tick_top()
         annot = True if max(_map.shape) <= 20 else False
         fmt = ".2f" if max(_map.shape) <= 20 else ".1f"
@@ -199,6 +373,8 @@ class Environment:
         Returns:
             None
         """
+        from matplotlib import pyplot as plt
+
         mng = plt.get_current_fig_manager()
         match plt.get_backend():
             case "TkAgg":
@@ -235,6 +411,9 @@ class Environment:
         Returns:
             None
         """
+        from matplotlib import pyplot as plt
+        from matplotlib.patches import Circle
+
         _, ax = plt.subplots(1, 1, subplot_kw={'aspect': 'equal'})
         self.info_layers.get(_map_key, self.heatmap)(_map, ax)
         if start is not None:
@@ -264,6 +443,8 @@ class Environment:
         Returns:
             None
         """
+        from matplotlib import pyplot as plt
+
         _, axes = plt.subplots(1, 2, subplot_kw={'aspect': 'equal'})
         self.heatmap(_map, axes[0], False, start, target)
         self.contourmap(_map, axes[1])
@@ -280,23 +461,35 @@ def main() -> None:
     parser.add_argument('-d', '--display', type=str, default='heatmap', help='Map display method')
     parser.add_argument('-l', '--load', type=str, help='Load map from image')
     parser.add_argument('-r', '--random', action='store_true', help='Create random map')
+    parser.add_argument('-g', '--generate', type=str, choices=('maze', 'rooms', 'blobs'), help='Create a seeded map')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for generated maps')
+    parser.add_argument('--density', type=float, default=0.3, help='Obstacle density of blob maps')
+    parser.add_argument('-n', '--no-show', action='store_false', dest='show', help='Do not display the map')
     parser.add_argument('-s', '--save', type=str, default=None, help='Save map to image')
     parser.add_argument('-b', '--no-borders', action='store_false', dest='borders', help='Remove borders from map')
     args = parser.parse_args()
 
     # Create environment
-    env = Environment(args.mapsize)
-
-    if args.random:
+    env = Environment(tuple(args.mapsize))
+
+    if args.generate:
+        kwargs = {'density': args.density} if args.generate == 'blobs' else {}
+        env.map = env.map_generators[args.generate](args.seed, borders=args.borders, **kwargs)
+        if args.show:
+            env.show_map(env.map, args.display, f"{args.generate.capitalize()} map (seed {args.seed})")
+    elif args.random:
         rng_map = env.create_random_map(args.borders)
-        env.show_map(rng_map, args.display, "Random map")
-        env.show_all_maps(rng_map)
+        if args.show:
+            env.show_map(rng_map, args.display, "Random map")
+            env.show_all_maps(rng_map)
     elif args.load:
         img_map = env.load_map_from_image(args.load, borders=args.borders)
-        env.show_map(img_map, args.display, "Image map")
+        if args.show:
+            env.show_map(img_map, args.display, "Image map")
     else:
         empty_map = env.create_empty_map(args.borders)
-        env.show_map(empty_map, args.display, "Empty map")
+        if args.show:
+            env.show_map(empty_map, args.display, "Empty map")
 
     # Save maps to images
     if args.save: